@@ -0,0 +1,313 @@
+"""
+The effects as frame generators.
+
+Each animation owns a FrameBuffer for its layout, renders one frame at a time into it and
+yields the (N, bpp) pixel array, leaving pacing and output to whoever iterates it (the
+asyncio engine, a bake recorder, a compositor, ...). Nothing here sleeps or touches the
+strip, so an animation can be paused, cancelled or crossfaded between any two frames.
+
+Waits are given in seconds and turned into frames at `fps`; steps shorter than a frame
+share frames rather than slowing the effect down.
+
+The drip, wave, rainbow cycle and tunnel drips are also available as stateless `render(t)` functions
+(the `*_render` factories, see RENDERERS) that compute the frame at any time directly,
+so frames can be skipped, rendered out of order or in several processes, and the same
+effect can be kept in step on several controllers. `render(t)` returns a new frame each
+call; `render(t, out)` renders into the (N, 3) array `out` and returns it, so a player
+showing one frame at a time can reuse a single buffer.
+"""
+
+import functools
+from itertools import chain, count
+
+import numpy as np
+
+from colormath import apply_brightness, fade_levels, scale_color
+from framebuffer import FrameBuffer
+from geometry import ring, ring_arrays
+from palette import wheel_palette
+from snow import snowing
+
+FPS = 20  # Default frame rate of the engine driving the animations
+
+
+class _Timeline:
+    """
+    Turns the steps of an animation, each lasting some seconds, into frames at `fps`.
+    Steps shorter than a frame share frames, so several of them are advanced per frame
+    and the animation keeps its speed at any frame rate.
+    """
+
+    def __init__(self, fps):
+        self.fps = fps
+        self.elapsed = 0.0
+        self.frames = 0
+
+    def hold(self, frame, seconds):
+        """
+        Yields the current frame for the frames that end within the next `seconds`
+        (none when the step is over before the next frame is due).
+        """
+        self.elapsed += seconds
+        due = round(self.elapsed * self.fps)
+        for _ in range(due - self.frames):
+            yield frame.pixels
+        self.frames = max(self.frames, due)
+
+
+def _step(t, seconds):
+    """
+    Number of whole `seconds` steps in `t`, robust to float error in frame times.
+    """
+    return int(t / seconds + 1e-9)
+
+
+def _timed(render, duration, fps):
+    """
+    Plays a stateless `render(t)` at `fps`, for `duration` seconds or forever, rendering
+    every frame into the buffer of the first one.
+    """
+    frame_numbers = count() if duration is None else range(max(1, round(duration * fps)))
+    out = None
+    for frame_number in frame_numbers:
+        out = render(frame_number / fps, out)
+        yield out
+
+
+def _frame(layout, out):
+    """
+    Returns `out`, or a new (num_pixels, 3) frame for a `render(t)` called without one.
+    """
+    if out is None:
+        return np.empty((layout.num_pixels, 3), dtype=np.uint8)
+    return out
+
+
+def _rings(layout):
+    return ring_arrays(layout.num_rows, layout.num_cols, layout.centers, layout.pixel_index)
+
+
+def drip(layout, color, wait=0.1, fps=FPS):
+    render = drip_render(layout, color, wait)
+    yield from _timed(render, render.period * (layout.num_rows + layout.num_cols), fps)
+
+
+def drip_render(layout, color, wait=0.1):
+    """
+    Returns `render(t, out=None)`, the drip's frame `t` seconds after it starts, repeating
+    once every ring has dripped. `render.period` is the time one ring takes.
+    """
+    rings = _rings(layout)
+    num_rings = layout.num_rows + layout.num_cols
+    # Each ring is lit for `wait`, then fades out over 11 steps of `wait / 5`
+    fade_wait = wait / 5
+    period = wait + 11 * fade_wait
+    levels = fade_levels(color, 10)  # levels[k] is the color k steps into the fade
+
+    def render(t, out=None):
+        out = _frame(layout, out)
+        distance = _step(t, period)
+        phase = t - distance * period
+        fade_step = 0 if phase < wait else min(10, _step(phase - wait, fade_wait))
+        out.fill(0)
+        out[ring(rings, distance % num_rings)] = levels[fade_step]
+        return out
+
+    render.period = period
+    return render
+
+
+def wave(layout, color, wave_length=5, wait=0.05, fps=FPS):
+    yield from _timed(wave_render(layout, color, wave_length, wait), (layout.num_pixels + wave_length) * wait, fps)
+
+
+def wave_render(layout, color, wave_length=5, wait=0.05):
+    """
+    Returns `render(t, out=None)`, the wave's frame `t` seconds after it starts, with the
+    band moving one pixel every `wait` seconds.
+    """
+    half_width = wave_length // 2 + 1
+    # The band's colors, computed once: brightness falls off linearly from the center
+    # and is 0 from `half_width` pixels away
+    offsets = np.arange(1 - half_width, half_width)
+    band = apply_brightness(color, 1.0 - np.abs(offsets) / half_width)
+    # Strip index of each position along the wave, which runs through the matrix row by row
+    order = layout.index_map.ravel()
+
+    def render(t, out=None):
+        out = _frame(layout, out)
+        position = _step(t, wait)
+        start = max(0, position - half_width + 1)
+        stop = min(layout.num_pixels, position + half_width)
+        channels = min(band.shape[1], out.shape[1])
+        out.fill(0)
+        if start < stop:
+            lit = band[start - position + half_width - 1:stop - position + half_width - 1]
+            out[order[start:stop], :channels] = lit[:, :channels]
+        return out
+
+    return render
+
+
+def breathe(layout, color, steps=50, pause=0.02, fps=FPS):
+    frame = FrameBuffer.for_layout(layout)
+    timeline = _Timeline(fps)
+    for b in chain(range(steps), range(steps, -1, -1)):
+        frame.fill(scale_color(color, b / steps))
+        yield from timeline.hold(frame, pause)
+
+
+def rainbow_cycle(layout, wait=0.02, fps=FPS):
+    render = rainbow_cycle_render(layout, wait)
+    yield from _timed(render, render.period, fps)
+
+
+def rainbow_cycle_render(layout, wait=0.02):
+    """
+    Returns `render(t, out=None)`, the rainbow cycle's frame `t` seconds after it starts,
+    with the hues advancing one step every `wait` seconds and repeating every
+    `render.period`. Steps shorter than a frame are skipped rather than slowing the cycle down.
+    """
+    palette = wheel_palette(3)
+    hues = np.arange(layout.num_pixels) * 256 // layout.num_pixels
+
+    def render(t, out=None):
+        return palette.lookup(hues + _step(t, wait) % 255, out=_frame(layout, out))
+
+    render.period = 255 * wait
+    return render
+
+
+def color_chase(layout, color, wait=0.05, fps=FPS):
+    frame = FrameBuffer.for_layout(layout)
+    timeline = _Timeline(fps)
+    for i in range(layout.num_pixels):
+        frame.set_pixels(i, color)
+        yield from timeline.hold(frame, wait)
+    yield from timeline.hold(frame, 0.5)
+
+
+def color_wipe(layout, color, wait=0.02, fps=FPS):
+    frame = FrameBuffer.for_layout(layout)
+    timeline = _Timeline(fps)
+    for i in range(layout.num_pixels):
+        frame.set_pixels(slice(0, i + 1), color)
+        yield from timeline.hold(frame, wait)
+
+
+def blink(layout, color, wait=0.5, times=5, fps=FPS):
+    frame = FrameBuffer.for_layout(layout)
+    timeline = _Timeline(fps)
+    for _ in range(times):
+        frame.fill(color)
+        yield from timeline.hold(frame, wait)
+        frame.clear()
+        yield from timeline.hold(frame, wait)
+
+
+def theater_chase(layout, color, wait=0.1, fps=FPS):
+    """
+    Theater chase effect where every third LED is lit, creating a marquee effect.
+    """
+    frame = FrameBuffer.for_layout(layout)
+    timeline = _Timeline(fps)
+    for cycle in range(10):
+        for offset in range(3):
+            frame.clear()
+            frame.set_pixels(slice(-offset % 3, None, 3), color)
+            yield from timeline.hold(frame, wait)
+
+
+def tunnel_drip(layout, color, max_distance=None, ring_interval=4, duration=None, fps=FPS):
+    """
+    Continuous tunnel drip with overlapping drips; runs forever unless `duration` is given.
+    """
+    yield from _timed(tunnel_drip_render(layout, color, max_distance, ring_interval), duration, fps)
+
+
+def tunnel_drip_rainbow(layout, max_distance=None, ring_interval=4, swirl_speed=3, duration=None, fps=FPS):
+    """
+    Forward tunnel drip with rainbow colors that swirl outward.
+    """
+    render = tunnel_drip_rainbow_render(layout, max_distance, ring_interval, swirl_speed)
+    yield from _timed(render, duration, fps)
+
+
+def tunnel_drip_rainbow_reverse(layout, max_distance=None, ring_interval=4, swirl_speed=2, duration=None, fps=FPS):
+    """
+    Reverse tunnel drip with rainbow colors that swirl inward.
+    """
+    render = tunnel_drip_rainbow_render(layout, max_distance, ring_interval, swirl_speed, reverse=True)
+    yield from _timed(render, duration, fps)
+
+
+def tunnel_drip_render(layout, color, max_distance=None, ring_interval=4, step=0.05):
+    """
+    Returns `render(t, out=None)`, the tunnel drip's frame `t` seconds after it starts.
+    """
+    return _tunnel_render(layout, max_distance, ring_interval, step, lambda distance, step_number: color)
+
+
+def tunnel_drip_rainbow_render(layout, max_distance=None, ring_interval=4, swirl_speed=3, reverse=False, step=0.05):
+    """
+    Returns `render(t, out=None)`, the rainbow tunnel drip's frame `t` seconds after it starts.
+    """
+    max_distance = max_distance or layout.num_rows + layout.num_cols
+    wheel = wheel_palette(3).color
+
+    def ring_color(distance, step_number):
+        return wheel((distance * 256 // max_distance + step_number * swirl_speed) % 256)
+
+    return _tunnel_render(layout, max_distance, ring_interval, step, ring_color, reverse)
+
+
+def _tunnel_render(layout, max_distance, ring_interval, step, ring_color, reverse=False):
+    """
+    A drip starts every `ring_interval` steps and moves one ring per step until it has
+    crossed `max_distance`, so the drips on screen at step k are the ones aged
+    k % ring_interval, k % ring_interval + ring_interval, ... up to max_distance and k.
+    """
+    rings = _rings(layout)
+    max_distance = max_distance or layout.num_rows + layout.num_cols
+
+    def render(t, out=None):
+        out = _frame(layout, out)
+        step_number = _step(t, step)
+        out.fill(0)
+        for age in range(step_number % ring_interval, min(max_distance, step_number) + 1, ring_interval):
+            distance = max_distance - age if reverse else age
+            brightness = max(0, 1 - (distance / max_distance))
+            out[ring(rings, distance)] = scale_color(ring_color(distance, step_number), brightness)
+        return out
+
+    return render
+
+
+# Name -> animation, for engines and command interfaces. Color effects take `color` as
+# their second argument.
+ANIMATIONS = {
+    "drip": drip,
+    "wave": wave,
+    "breathe": breathe,
+    "rainbow_cycle": rainbow_cycle,
+    "color_chase": color_chase,
+    "color_wipe": color_wipe,
+    "blink": blink,
+    "theater_chase": theater_chase,
+    "tunnel_drip": tunnel_drip,
+    "tunnel_drip_rainbow": tunnel_drip_rainbow,
+    "tunnel_drip_rainbow_reverse": tunnel_drip_rainbow_reverse,
+    "snowing": snowing,
+}
+
+# Name -> factory of a stateless `render(t, out=None)`. Each takes the animation's layout, color and
+# effect parameters but no `fps` or `duration`, since the caller picks the times; the
+# tunnel factories also take `step`, the seconds between tunnel steps
+RENDERERS = {
+    "drip": drip_render,
+    "wave": wave_render,
+    "rainbow_cycle": rainbow_cycle_render,
+    "tunnel_drip": tunnel_drip_render,
+    "tunnel_drip_rainbow": tunnel_drip_rainbow_render,
+    "tunnel_drip_rainbow_reverse": functools.partial(tunnel_drip_rainbow_render, swirl_speed=2, reverse=True),
+}
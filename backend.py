@@ -0,0 +1,118 @@
+import os
+
+# Pixel orders, spelled the way `neopixel` spells them
+RGB = "RGB"
+GRB = "GRB"
+RGBW = "RGBW"
+GRBW = "GRBW"
+
+# Environment variables selecting and configuring the output backend
+BACKEND_ENV = "NEOPIXEL_BACKEND"  # "auto" (default), "neopixel" or "sim"
+RECORD_ENV = "NEOPIXEL_SIM_RECORD"  # File the simulated strip appends sent frames to
+REALTIME_ENV = "NEOPIXEL_SIM_REALTIME"  # "1" to make simulated show() take real wire time
+
+
+def create_strip(pin, n, backend=None, skip_unchanged=True, **kwargs):
+    """
+    Creates the output strip for an effect script.
+
+    With the "neopixel" backend this is a real `neopixel.NeoPixel` on `board.<pin>`; with
+    "sim" it is a `simstrip.SimulatedNeoPixel` that records frames in memory or to a file.
+    The default "auto" backend uses the hardware when `board`/`neopixel` are importable
+    and falls back to the simulator everywhere else (e.g. on a dev laptop).
+
+    Parameters:
+    - pin: Name of the data pin on `board`, e.g. "D21".
+    - n: Number of pixels.
+    - backend: "auto", "neopixel" or "sim"; defaults to $NEOPIXEL_BACKEND or "auto".
+    - skip_unchanged: Wrap the strip in a `framebuffer.ChangeTrackingStrip` so `show()`
+      skips frames identical to the last one sent.
+    - kwargs: Passed on to the strip (brightness, auto_write, pixel_order, ...).
+    """
+    strip = _create_strip(pin, n, backend, **kwargs)
+    if skip_unchanged:
+        from framebuffer import ChangeTrackingStrip
+
+        strip = ChangeTrackingStrip(strip)
+    return strip
+
+
+def _create_strip(pin, n, backend, **kwargs):
+    backend = backend or os.environ.get(BACKEND_ENV, "auto")
+    if backend not in ("auto", "neopixel", "sim"):
+        raise ValueError(f"Unknown backend {backend!r}, expected 'auto', 'neopixel' or 'sim'")
+
+    if backend != "sim":
+        try:
+            import board
+            import neopixel
+        except (ImportError, NotImplementedError):
+            # Blinka raises NotImplementedError when it doesn't recognise the board
+            if backend == "neopixel":
+                raise
+        else:
+            order = kwargs.get("pixel_order")
+            if isinstance(order, str):
+                kwargs["pixel_order"] = getattr(neopixel, order)
+            return neopixel.NeoPixel(getattr(board, pin), n, **kwargs)
+
+    from simstrip import SimulatedNeoPixel
+
+    return SimulatedNeoPixel(
+        pin,
+        n,
+        record_file=os.environ.get(RECORD_ENV),
+        realtime=os.environ.get(REALTIME_ENV) == "1",
+        **kwargs,
+    )
+
+
+class LazyStrip:
+    """
+    Stands in for the output strip and creates it with `create_strip` on first use, so
+    importing an effect module neither touches the hardware nor imports the driver.
+
+    Parameters are those of `create_strip`.
+    """
+
+    def __init__(self, pin, n, **kwargs):
+        self._args = (pin, n)
+        self._kwargs = kwargs
+        self._strip = None
+
+    @property
+    def strip(self):
+        if self._strip is None:
+            self._strip = create_strip(*self._args, **self._kwargs)
+        return self._strip
+
+    def __getattr__(self, name):
+        # Only called for names not found on the proxy itself
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.strip, name)
+
+    def __setattr__(self, name, value):
+        if name.startswith("_"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.strip, name, value)
+
+    def __len__(self):
+        return self._args[1]
+
+    def __getitem__(self, index):
+        return self.strip[index]
+
+    def __setitem__(self, index, value):
+        self.strip[index] = value
+
+    def write_frame(self, frame):
+        """
+        Bulk-writes an (N, bpp) frame to the strip with `framebuffer.write_frame`. The
+        proxy hides the strip's private byte buffers, so without this `write_frame` would
+        fall back to one tuple per pixel.
+        """
+        from framebuffer import write_frame
+
+        write_frame(self.strip, frame)
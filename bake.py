@@ -0,0 +1,352 @@
+"""
+Bakes deterministic effects into compact frame files and replays them.
+
+Baking runs an effect once, offline and as fast as possible, against a recording strip
+and stores every frame it shows. Playback memory-maps the file and copies each frame
+straight into the strip buffer, so a controller replaying a baked show spends almost no
+CPU on rendering.
+
+File format: a fixed header followed by the frames, each `num_pixels * bpp` bytes of
+RGB(W) in strip order. With FLAG_DELTA each stored frame is XORed with the previous one
+(runs of unchanged pixels become zeros); with FLAG_ZLIB the frame data is zlib
+compressed and is decompressed into memory on load instead of being memory-mapped.
+
+    python bake.py rainbow_cycle -o rainbow.npxb
+    python bake.py --play rainbow.npxb --loop
+
+Output files ending in .npxs are written as keyframe + sparse-delta sequences instead
+(see sequence.py).
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import random
+import struct
+import time
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+from framebuffer import write_frame
+from scheduler import FrameClock
+from simstrip import SimulatedNeoPixel
+
+MAGIC = b"NPXB"
+VERSION = 1
+FLAG_DELTA = 1
+FLAG_ZLIB = 2
+# magic, version, flags, bpp, num_pixels, frame_count, fps
+HEADER = struct.Struct("<4sBBHIIf")
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "neopixel", "bakes")
+
+
+class FrameLimitReached(Exception):
+    pass
+
+
+class RecordingStrip(SimulatedNeoPixel):
+    """
+    Simulated RGB strip at full brightness, so its buffer holds raw RGB(W) bytes in strip
+    order. Keeps every shown frame unless `record` is False, and stops the effect once
+    `max_frames` frames were shown.
+    """
+
+    def __init__(self, n, bpp=3, max_frames=None, record=True):
+        super().__init__(
+            None, n, brightness=1.0, auto_write=False, pixel_order="RGBW"[:bpp], record=record
+        )
+        self.max_frames = max_frames
+
+    def show(self):
+        super().show()
+        if self.max_frames is not None and self.show_count >= self.max_frames:
+            raise FrameLimitReached
+
+
+def run_offline(render, strip, seed=0):
+    """
+    Runs `render(strip)` with `random` seeded, so the effect renders reproducibly, until it
+    ends or the strip's frame limit is hit. `render` should show its frames unpaced: frame
+    generators are, and anything paced by a FrameClock should be given
+    `FrameClock(fps, paced=False)`.
+    """
+    random.seed(seed)
+    try:
+        render(strip)
+    except FrameLimitReached:
+        pass
+
+
+def record(render, num_pixels, bpp=3, max_frames=None, seed=0):
+    """
+    Runs `render(strip)` offline and returns the frames it showed as a
+    (frames, num_pixels, bpp) uint8 array.
+
+    Parameters:
+    - render: Callable drawing the effect onto the strip it is given.
+    - num_pixels: Length of the strip.
+    - bpp: Bytes per pixel.
+    - max_frames: Stop after this many frames (required for endless effects).
+    - seed: Seed for `random`, so effects with random elements bake reproducibly.
+    """
+    strip = RecordingStrip(num_pixels, bpp, max_frames)
+    run_offline(render, strip, seed)
+    data = b"".join(strip.frames)
+    return np.frombuffer(data, dtype=np.uint8).reshape(len(strip.frames), num_pixels, bpp)
+
+
+def write_frames(path, frames, fps=20, delta=False, compress=False):
+    """
+    Writes a (frames, num_pixels, bpp) uint8 array to a frame file.
+    """
+    frames = np.ascontiguousarray(frames, dtype=np.uint8)
+    frame_count, num_pixels, bpp = frames.shape
+    flags = (FLAG_DELTA if delta else 0) | (FLAG_ZLIB if compress else 0)
+
+    body = frames
+    if delta and frame_count:
+        body = frames.copy()
+        body[1:] ^= frames[:-1]
+    body = body.tobytes()
+    if compress:
+        body = zlib.compress(body, 9)
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, flags, bpp, num_pixels, frame_count, fps))
+        f.write(body)
+
+
+def bake(path, render, num_pixels, bpp=3, fps=20, max_frames=None, delta=False, compress=False):
+    """
+    Records an effect and writes it to `path`. Returns the number of frames baked.
+    """
+    frames = record(render, num_pixels, bpp, max_frames)
+    write_frames(path, frames, fps, delta, compress)
+    return len(frames)
+
+
+class FramePlayer:
+    """
+    Plays back a baked frame file.
+
+    Uncompressed files are memory-mapped and frames are read in place without copying;
+    compressed files are inflated into memory once when opened.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            magic, version, flags, bpp, num_pixels, frame_count, fps = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} frame file")
+            self.bpp = bpp
+            self.num_pixels = num_pixels
+            self.frame_count = frame_count
+            self.fps = fps
+            self.delta = bool(flags & FLAG_DELTA)
+
+            self._mmap = None
+            if flags & FLAG_ZLIB:
+                data = zlib.decompress(f.read())
+                offset = 0
+            elif frame_count:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                data = self._mmap
+                offset = HEADER.size
+            else:
+                data = b""
+                offset = 0
+        self._frames = np.frombuffer(
+            data, dtype=np.uint8, count=frame_count * num_pixels * bpp, offset=offset
+        ).reshape(frame_count, num_pixels, bpp)
+        self._current = np.zeros((num_pixels, bpp), dtype=np.uint8)
+        self._position = -1
+
+    def __len__(self):
+        return self.frame_count
+
+    def frame(self, index):
+        """
+        Returns frame `index` as a (num_pixels, bpp) array. Raw files return a read-only
+        view into the file; delta files decode forward from the last frame returned.
+        """
+        if not self.delta:
+            return self._frames[index]
+        if index < self._position:
+            self._current.fill(0)
+            self._position = -1
+        while self._position < index:
+            self._position += 1
+            self._current ^= self._frames[self._position]
+        return self._current
+
+    def play(self, strip, loop=False, clock=None):
+        """
+        Streams the frames into `strip` at the baked frame rate.
+        """
+        clock = clock or FrameClock(self.fps)
+        while True:
+            for index in clock.frames(self.frame_count, fps=self.fps):
+                write_frame(strip, self.frame(index))
+                strip.show()
+            if not loop:
+                break
+
+    def close(self):
+        self._frames = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+
+def layout_key(layout):
+    """
+    Identifies a layout by its compiled index map, so equal wirings share baked files.
+    """
+    index_map = np.ascontiguousarray(layout.index_map)
+    digest = hashlib.sha1(index_map.tobytes()).hexdigest()
+    return f"{index_map.shape[0]}x{index_map.shape[1]}-{digest[:16]}"
+
+
+class BakeCache:
+    """
+    LRU cache of baked effects keyed by effect name, parameters, layout and bake options.
+
+    Baked files live in `directory`; the least recently used ones are deleted once there
+    are more than `max_files`. Up to `max_open` players stay open in memory.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_files=32, max_open=4):
+        self.directory = directory
+        self.max_files = max_files
+        self.max_open = max_open
+        self._open = OrderedDict()
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, name, params, layout, bake_options=None):
+        # Frame rate, frame limit and encoding change the baked frames, so they are part of the key
+        key = json.dumps([name, params, layout_key(layout), bake_options or {}], sort_keys=True, default=str)
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + ".npxb")
+
+    def get(self, name, params, layout, render, **bake_options):
+        """
+        Returns a player for the effect, baking it first if it isn't cached yet.
+
+        Parameters:
+        - name: Effect name.
+        - params: JSON-serializable effect parameters.
+        - layout: The `layout.Layout` the effect renders for.
+        - render: Callable drawing the effect onto the strip it is given.
+        - bake_options: Passed on to `bake` (bpp, fps, max_frames, delta, compress).
+        """
+        path = self.path_for(name, params, layout, bake_options)
+        if path in self._open:
+            self._open.move_to_end(path)
+            os.utime(path)
+            return self._open[path]
+
+        if os.path.exists(path):
+            os.utime(path)
+        else:
+            partial = path + ".partial"
+            bake(partial, render, layout.num_pixels, **bake_options)
+            os.replace(partial, path)
+            self._evict_files()
+
+        player = FramePlayer(path)
+        self._open[path] = player
+        while len(self._open) > self.max_open:
+            _, oldest = self._open.popitem(last=False)
+            oldest.close()
+        return player
+
+    def _evict_files(self):
+        files = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".npxb")
+        ]
+        files.sort(key=os.path.getmtime)
+        for path in files[: max(0, len(files) - self.max_files)]:
+            player = self._open.pop(path, None)
+            if player is not None:
+                player.close()
+            os.remove(path)
+
+
+def main(argv=None):
+    import effects
+    from pipeline import output, run_pipeline
+
+    frame_effects = sorted(name for name, effect in effects.REGISTRY.items() if effect.kind == "frames")
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("effect", nargs="?", choices=frame_effects)
+    parser.add_argument("-o", "--output", help="Frame file to write")
+    parser.add_argument("--frames", type=int, default=600, help="Frame limit for endless effects")
+    parser.add_argument("--fps", type=float, default=20)
+    parser.add_argument("--delta", action="store_true", help="XOR-delta encode frames")
+    parser.add_argument("--compress", action="store_true", help="zlib compress frames")
+    parser.add_argument(
+        "--keyframe-interval", type=int, default=60, help="Keyframe spacing for .npxs sequences"
+    )
+    parser.add_argument("--play", metavar="FILE", help="Play a frame file on the strip")
+    parser.add_argument("--loop", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.play:
+        if args.play.endswith(".npxs"):
+            from sequence import SequenceReader
+
+            player = SequenceReader(args.play)
+        else:
+            player = FramePlayer(args.play)
+        strip = effects.strip()
+        if player.num_pixels > len(strip):
+            parser.error(f"{args.play} has {player.num_pixels} pixels, the layout only {len(strip)}")
+        player.play(strip, loop=args.loop)
+        return
+    if not args.effect or not args.output:
+        parser.error("an effect and --output are required when baking")
+
+    layout = effects.layout()
+
+    def render(strip):
+        frames = effects.frames(args.effect, layout, fps=args.fps)
+        run_pipeline(frames, output(strip))
+
+    start = time.perf_counter()
+    if args.output.endswith(".npxs"):
+        from sequence import record_sequence
+
+        count = record_sequence(
+            args.output,
+            render,
+            layout.num_pixels,
+            fps=args.fps,
+            max_frames=args.frames,
+            keyframe_interval=args.keyframe_interval,
+        )
+    else:
+        count = bake(
+            args.output,
+            render,
+            layout.num_pixels,
+            fps=args.fps,
+            max_frames=args.frames,
+            delta=args.delta,
+            compress=args.compress,
+        )
+    print(
+        f"Baked {count} frames of {args.effect} to {args.output} "
+        f"({os.path.getsize(args.output)} bytes) in {time.perf_counter() - start:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Benchmarks the render cost of every effect on the simulated strip.
+
+Each animation (animations.py, as played by the engine) pushes its frames to the strip
+unpaced for a fixed number of frames (one frame = one `show()` call), across several
+matrix sizes, and reports frames/sec, microseconds per frame, transient allocation per
+frame, how many frames were actually sent vs. skipped as unchanged, and the modeled
+WS2812 wire limit. Use --json to write
+machine-readable results for tracking regressions.
+
+    python benchmark.py --frames 200 --sizes 10x10,32x32,64x64,1x1000 --json bench.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import animations
+from effects import REGISTRY
+from framebuffer import ChangeTrackingStrip
+from layout import Layout
+from pipeline import output, run_pipeline
+from simstrip import SimulatedNeoPixel
+
+DEFAULT_SIZES = [(10, 10), (32, 32), (64, 64), (1, 1000)]
+DEFAULT_FRAMES = 200
+WARMUP_FRAMES = 5
+COLOR = (0, 128, 255)
+
+
+class FrameLimitReached(Exception):
+    pass
+
+
+class BenchmarkStrip(ChangeTrackingStrip):
+    """
+    Simulated strip that stops the running effect after `limit` frames, so infinite
+    effects (tunnels, snow) can be benchmarked like finite ones. Frames identical to the
+    previous one count towards the limit but are not sent, as on a real installation.
+    """
+
+    def __init__(self, n, limit, trace_allocations=False):
+        super().__init__(
+            SimulatedNeoPixel(None, n, brightness=0.5, auto_write=False, pixel_order="GRB")
+        )
+        self.limit = limit
+        self.trace_allocations = trace_allocations
+        self.alloc_peak_total = 0
+
+    @property
+    def frames(self):
+        return self.frames_sent + self.frames_skipped
+
+    def show(self):
+        sent = super().show()
+        if self.trace_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            self.alloc_peak_total += peak - current
+            tracemalloc.reset_peak()
+        if self.frames >= self.limit:
+            raise FrameLimitReached
+        return sent
+
+
+def animation(name):
+    """
+    Returns `effect(layout, strip)` pushing the animation's frames to the strip as fast
+    as they render, with its default parameters.
+    """
+    function = animations.ANIMATIONS[name]
+    args = (COLOR,) if REGISTRY[name].color else ()
+    return lambda layout, strip: run_pipeline(function(layout, *args), output(strip))
+
+
+EFFECTS = {name: animation(name) for name in animations.ANIMATIONS}
+
+
+def run_frames(effect, num_rows, num_cols, frames, trace_allocations=False):
+    """
+    Runs `effect` (repeating it if it finishes early) until `frames` frames were shown.
+    Returns the strip and the elapsed wall time in seconds.
+    """
+    strip = BenchmarkStrip(num_rows * num_cols, frames, trace_allocations)
+    layout = Layout(num_rows, num_cols)
+    start = time.perf_counter()
+    try:
+        while True:
+            shown = strip.frames
+            effect(layout, strip)
+            if strip.frames == shown:
+                break  # The effect shows nothing at this size
+    except FrameLimitReached:
+        pass
+    return strip, time.perf_counter() - start
+
+
+def benchmark(name, num_rows, num_cols, frames):
+    """
+    Benchmarks one effect at one matrix size and returns its result record.
+    """
+    effect = EFFECTS[name]
+    run_frames(effect, num_rows, num_cols, WARMUP_FRAMES)
+    strip, elapsed = run_frames(effect, num_rows, num_cols, frames)
+
+    tracemalloc.start()
+    try:
+        traced, _ = run_frames(effect, num_rows, num_cols, frames, trace_allocations=True)
+    finally:
+        tracemalloc.stop()
+
+    shown = strip.frames
+    fps = shown / elapsed if elapsed > 0 else 0.0
+    return {
+        "effect": name,
+        "rows": num_rows,
+        "cols": num_cols,
+        "pixels": num_rows * num_cols,
+        "frames": shown,
+        "seconds": elapsed,
+        "fps": fps,
+        "us_per_frame": elapsed / shown * 1e6 if shown else 0.0,
+        "alloc_bytes_per_frame": traced.alloc_peak_total / max(traced.frames, 1),
+        "show_count": strip.show_count,
+        "frames_skipped": strip.frames_skipped,
+        "wire_us_per_frame": strip.frame_wire_time * 1e6,
+        "wire_limited_fps": min(fps, strip.max_fps()),
+    }
+
+
+def parse_sizes(text):
+    sizes = []
+    for size in text.split(","):
+        rows, cols = size.lower().split("x")
+        sizes.append((int(rows), int(cols)))
+    return sizes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES)
+    parser.add_argument(
+        "--sizes",
+        type=parse_sizes,
+        default=DEFAULT_SIZES,
+        help="Comma separated ROWSxCOLS list, e.g. 10x10,1x1000",
+    )
+    parser.add_argument(
+        "--effects", default=",".join(EFFECTS), help="Comma separated effect names"
+    )
+    parser.add_argument("--json", metavar="FILE", help="Write results as JSON ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    names = args.effects.split(",")
+    unknown = [name for name in names if name not in EFFECTS]
+    if unknown:
+        parser.error(f"unknown effects: {', '.join(unknown)}")
+
+    results = []
+    for num_rows, num_cols in args.sizes:
+        for name in names:
+            result = benchmark(name, num_rows, num_cols, args.frames)
+            results.append(result)
+            sys.stderr.write(
+                f"{name:>28} {num_rows:>3}x{num_cols:<4} "
+                f"{result['fps']:>10.1f} fps {result['us_per_frame']:>10.1f} us/frame "
+                f"{result['alloc_bytes_per_frame']:>9.0f} B/frame "
+                f"{result['show_count']:>5} shows {result['frames_skipped']:>5} skipped\n"
+            )
+
+    if args.json:
+        report = {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "frames": args.frames,
+            "results": results,
+        }
+        if args.json == "-":
+            json.dump(report, sys.stdout, indent=2)
+            sys.stdout.write("\n")
+        else:
+            with open(args.json, "w") as f:
+                json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+from functools import lru_cache
+
+import numpy as np
+
+DEFAULT_GAMMA = 2.8  # Typical perceptual correction for WS2812 LEDs
+
+
+@lru_cache(maxsize=512)
+def scale_lut(scale):
+    """
+    Returns a read-only 256-entry uint8 table where entry `c` is `int(c * scale)`.
+
+    Tables are cached per scale factor, so the handful of fade levels an effect uses are
+    each computed once and then reused for every pixel of every frame.
+    """
+    scale = min(max(scale, 0.0), 1.0)
+    table = (np.arange(256) * scale).astype(np.uint8)
+    table.flags.writeable = False
+    return table
+
+
+@lru_cache(maxsize=1024)
+def _scale_color(color, scale):
+    table = scale_lut(scale)
+    return tuple(int(table[c]) for c in color)
+
+
+def scale_color(color, scale):
+    """
+    Scales an RGB(W) color tuple by a brightness factor between 0 and 1.
+
+    Parameters:
+    - color: Tuple (R, G, B) or (R, G, B, W) with components in 0-255.
+    - scale: Brightness factor, clamped to 0-1.
+    """
+    return _scale_color(tuple(color), scale)
+
+
+def fade_levels(color, steps):
+    """
+    Returns a (steps + 1, channels) uint8 array of `color` faded from full brightness
+    down to off in `steps` equal steps.
+    """
+    color = np.asarray(color, dtype=np.uint8)
+    return np.stack([scale_lut(step / steps)[color] for step in range(steps, -1, -1)])
+
+
+@lru_cache(maxsize=8)
+def gamma_lut(gamma=DEFAULT_GAMMA):
+    """
+    Returns a read-only 256-entry uint8 gamma-correction table.
+    """
+    table = np.round((np.arange(256) / 255.0) ** gamma * 255.0).astype(np.uint8)
+    table.flags.writeable = False
+    return table
+
+
+def apply_gamma(frame, gamma=DEFAULT_GAMMA, out=None):
+    """
+    Gamma-corrects a whole uint8 frame with a single table lookup.
+    """
+    return np.take(gamma_lut(gamma), frame, out=out)
+
+
+def scale_frame(frame, scale, out=None):
+    """
+    Scales every channel of a uint8 frame by one brightness factor using the cached LUT.
+    """
+    return np.take(scale_lut(scale), frame, out=out)
+
+
+def apply_brightness(frame, mask, out=None):
+    """
+    Applies a per-pixel brightness mask to a whole frame at once.
+
+    Parameters:
+    - frame: uint8 array of shape (N, channels), or a single color broadcast to every pixel.
+    - mask: Float array of shape (N,) with brightness factors between 0 and 1.
+    - out: Optional uint8 array of shape (N, channels) to write the result into.
+    """
+    mask = np.clip(np.asarray(mask, dtype=np.float64), 0.0, 1.0)
+    scaled = mask[:, None] * np.asarray(frame, dtype=np.float64)
+    if out is None:
+        return scaled.astype(np.uint8)
+    np.copyto(out, scaled, casting="unsafe")
+    return out
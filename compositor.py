@@ -0,0 +1,157 @@
+"""
+Layered compositor: runs several effects at once and blends them into one frame.
+
+Each layer is a frame source (e.g. an effect from animations.py) with a blend mode and
+an opacity. Every tick the compositor pulls one frame from each layer, bottom to top,
+and blends it into a uint16 accumulator with whole-array numpy operations, so the cost
+is one vectorized pass per layer and there are no per-pixel Python loops.
+
+Blend modes:
+- add: channels are summed and clipped at 255.
+- max: per-channel maximum, so overlapping drips keep the brighter one.
+- alpha: the layer is painted over what is below it. Frames with an extra channel
+  (RGBA) carry their own per-pixel alpha; otherwise black pixels are transparent and
+  every other pixel covers with the layer's opacity.
+- multiply: channels are multiplied as fractions of 255, darkening what is below.
+
+    show = Compositor(LAYOUT.num_pixels)
+    show.add(animations.tunnel_drip_rainbow(LAYOUT), background=True)
+    show.add(animations.snowing(LAYOUT), "alpha")
+    run_pipeline(show.frames(), pace(20), output(pixels))
+"""
+
+import numpy as np
+
+from colormath import scale_frame
+
+BLEND_MODES = ("add", "max", "alpha", "multiply")
+
+
+class Layer:
+    """
+    One effect in a Compositor. `mode` and `opacity` can be changed while it runs.
+
+    Parameters:
+    - source: Iterator of (N, bpp) or (N, bpp + 1) RGBA uint8 frames.
+    - mode: Blend mode, one of BLEND_MODES.
+    - opacity: Layer strength between 0 and 1.
+    - background: The layer may run forever; the compositor ends without waiting for it.
+    - name: Optional name for display.
+    """
+
+    def __init__(self, source, mode="add", opacity=1.0, background=False, name=None):
+        if mode not in BLEND_MODES:
+            raise ValueError(f"mode must be one of {BLEND_MODES}, got {mode!r}")
+        self.source = iter(source)
+        self.mode = mode
+        self.opacity = opacity
+        self.background = background
+        self.name = name
+        self.finished = False
+
+
+class Compositor:
+    """
+    Blends a stack of layers into a single (num_pixels, bpp) frame per tick.
+
+    Parameters:
+    - num_pixels: Pixels per frame.
+    - bpp: Bytes per pixel of the output frames.
+    """
+
+    def __init__(self, num_pixels, bpp=3):
+        self.num_pixels = num_pixels
+        self.bpp = bpp
+        self.layers = []
+        self._acc = np.zeros((num_pixels, bpp), dtype=np.uint16)
+        self._tmp = np.zeros((num_pixels, bpp), dtype=np.uint16)
+        self._scaled = np.zeros((num_pixels, bpp), dtype=np.uint8)
+        self._alpha = np.zeros((num_pixels, 1), dtype=np.uint16)
+        self._out = np.zeros((num_pixels, bpp), dtype=np.uint8)
+
+    def add(self, source, mode="add", opacity=1.0, background=False, name=None):
+        """
+        Puts a new layer on top of the stack and returns it.
+        """
+        layer = Layer(source, mode, opacity, background, name)
+        self.layers.append(layer)
+        return layer
+
+    def remove(self, layer):
+        self.layers.remove(layer)
+        close = getattr(layer.source, "close", None)
+        if close is not None:
+            close()
+
+    def _blend(self, layer, frame):
+        acc, tmp, bpp = self._acc, self._tmp, self.bpp
+        color = frame[:, :bpp]
+        opacity = min(max(layer.opacity, 0.0), 1.0)
+
+        if layer.mode == "alpha":
+            alpha = self._alpha
+            if frame.shape[1] > bpp:
+                np.copyto(alpha, frame[:, bpp:bpp + 1])
+            else:
+                np.copyto(alpha, color.any(axis=1, keepdims=True))
+                alpha *= 255
+            if opacity < 1.0:
+                alpha *= round(opacity * 255)
+                alpha //= 255
+            # acc = (color * alpha + acc * (255 - alpha)) / 255, in place
+            np.multiply(color, alpha, out=tmp)
+            alpha ^= 255
+            acc *= alpha
+            acc += tmp
+            acc += 127
+            acc //= 255
+            return
+
+        if opacity < 1.0:
+            color = scale_frame(color, opacity, self._scaled)
+        if layer.mode == "add":
+            acc += color
+            np.minimum(acc, 255, out=acc)
+        elif layer.mode == "max":
+            np.maximum(acc, color, out=acc)
+        else:  # multiply
+            if opacity < 1.0:
+                # Blend the multiplier toward white (no change) as opacity drops
+                np.subtract(255, frame[:, :bpp], out=tmp)
+                tmp *= round(opacity * 256)
+                tmp >>= 8
+                np.subtract(255, tmp, out=tmp)
+                acc *= tmp
+            else:
+                acc *= color
+            acc //= 255
+
+    def render(self):
+        """
+        Pulls the next frame from every layer and returns the blended frame. Layers whose
+        source has ended are dropped.
+        """
+        self._acc.fill(0)
+        for layer in list(self.layers):
+            frame = next(layer.source, None)
+            if frame is None:
+                layer.finished = True
+                self.layers.remove(layer)
+                continue
+            self._blend(layer, frame)
+        np.copyto(self._out, self._acc, casting="unsafe")
+        return self._out
+
+    def frames(self):
+        """
+        Yields blended frames until every non-background layer has ended. A stack of only
+        background layers runs until all of them have ended.
+        """
+        forever = all(layer.background for layer in self.layers)
+        try:
+            while self.layers and (forever or any(not layer.background for layer in self.layers)):
+                yield self.render()
+        finally:
+            # Stop whatever is left, e.g. endless backgrounds or render worker processes
+            for layer in list(self.layers):
+                self.remove(layer)
@@ -0,0 +1,183 @@
+"""
+Registry of every effect, and the one place the layout and output strip are created.
+
+Effects are registered by name with the "module:function" that implements them, and
+modules are only imported when an effect is looked up, so listing effects or starting
+one does not pull in numpy, the network or the hardware driver until it is needed. The
+layout and strip are likewise created on first use.
+
+Two kinds of effect are registered:
+- "frames": `function(layout, [color,] **params)` returns a frame generator.
+- "driver": `function(layout, strip, fps, **params)` runs until interrupted, feeding the
+  strip itself (e.g. network input).
+
+    python -m effects --list
+    python -m effects drip color=255,0,0
+"""
+
+import importlib
+import json
+import os
+from functools import lru_cache
+
+PIN_ENV = "NEOPIXEL_PIN"  # Data pin on `board`, default "D21"
+DEFAULT_PIN = "D21"
+DEFAULT_COLOR = (0, 0, 255)
+
+REGISTRY = {}
+
+
+class Effect:
+    """
+    A registered effect.
+
+    Parameters:
+    - name: Name used on the command line.
+    - target: "module:function" implementing it.
+    - kind: "frames" or "driver".
+    - color: The function takes a color as its second argument.
+    - defaults: Parameters passed unless overridden.
+    - summary: One-line description for --list.
+    """
+
+    def __init__(self, name, target, kind="frames", color=False, defaults=None, summary=""):
+        self.name = name
+        self.target = target
+        self.kind = kind
+        self.color = color
+        self.defaults = defaults or {}
+        self.summary = summary
+
+    def load(self):
+        """
+        Imports the implementing module and returns the function.
+        """
+        module, function = self.target.split(":")
+        return getattr(importlib.import_module(module), function)
+
+
+def register(name, target, kind="frames", color=False, defaults=None, summary=""):
+    REGISTRY[name] = Effect(name, target, kind, color, defaults, summary)
+
+
+def get_effect(name):
+    try:
+        return REGISTRY[name]
+    except KeyError:
+        raise KeyError(f"unknown effect {name!r}, expected one of {', '.join(REGISTRY)}") from None
+
+
+def parse_value(text):
+    """
+    Parses a parameter value: JSON scalars, comma separated tuples (e.g. a color) or text.
+    """
+    try:
+        value = json.loads(f"[{text}]")
+    except ValueError:
+        return text
+    return value[0] if len(value) == 1 else tuple(value)
+
+
+@lru_cache(maxsize=None)
+def layout():
+    """
+    The matrix layout, from $NEOPIXEL_LAYOUT or the default 10x10 panel.
+    """
+    from layout import load_layout
+
+    return load_layout()
+
+
+def strip(brightness=0.5):
+    """
+    The output strip for the layout on $NEOPIXEL_PIN. The hardware is only set up when
+    the strip is first written to, so scripts can create it at import time.
+    """
+    return _strip(brightness)
+
+
+@lru_cache(maxsize=None)
+def _strip(brightness):
+    # Cached on the value, so strip() and strip(0.5) are the same strip
+    from backend import GRB, LazyStrip
+
+    pin = os.environ.get(PIN_ENV, DEFAULT_PIN)
+    return LazyStrip(pin, layout().num_pixels, brightness=brightness, auto_write=False, pixel_order=GRB)
+
+
+def clear(output_strip=None):
+    """
+    Turns every pixel off and shows it, on the shared strip unless another one is given.
+    """
+    target = output_strip or strip()
+    target.fill((0, 0, 0))
+    target.show()
+
+
+def frames(name, layout, color=None, **params):
+    """
+    Creates the frame generator of a "frames" effect for `layout`.
+    """
+    effect = get_effect(name)
+    if effect.kind != "frames":
+        raise ValueError(f"{name} drives the strip itself and has no frames")
+    args = (layout, color or DEFAULT_COLOR) if effect.color else (layout,)
+    return effect.load()(*args, **{**effect.defaults, **params})
+
+
+def run(name, fps=20, loop=False, color=None, output_strip=None, **params):
+    """
+    Runs an effect on the strip (the shared lazily created one unless given).
+
+    Parameters:
+    - name: Registered effect name.
+    - fps: Frame rate.
+    - loop: Restart "frames" effects when they end.
+    - color: Color for effects that take one.
+    - output_strip: Strip to use instead of `strip()`.
+    - params: Effect parameters.
+    """
+    effect = get_effect(name)
+    target = output_strip or strip()
+    if effect.kind == "driver":
+        return effect.load()(layout(), target, fps, **{**effect.defaults, **params})
+
+    from pipeline import output, pace, profile, run_pipeline
+    from profiler import profiler_from_env
+
+    profiler = profiler_from_env()
+    params.setdefault("fps", fps)
+    while True:
+        source = frames(name, layout(), color, **params)
+        run_pipeline(source, profile(profiler, "render", name), pace(fps, profiler=profiler), output(target, profiler))
+        if not loop:
+            break
+
+
+# Frame generators (animations.py)
+register("drip", "animations:drip", color=True, summary="Rings dripping out from the center")
+register("wave", "animations:wave", color=True, summary="A bright band moving along the strip")
+register("breathe", "animations:breathe", color=True, summary="Whole matrix fading in and out")
+register("rainbow_cycle", "animations:rainbow_cycle", summary="Rainbow cycling along the strip")
+register("color_chase", "animations:color_chase", color=True, summary="Pixels lighting one by one")
+register("color_wipe", "animations:color_wipe", color=True, summary="Color wiped along the strip")
+register("blink", "animations:blink", color=True, summary="Whole matrix blinking")
+register("theater_chase", "animations:theater_chase", color=True, summary="Marquee of every third pixel")
+register("tunnel_drip", "animations:tunnel_drip", color=True, summary="Endless overlapping drips")
+register("tunnel_drip_rainbow", "animations:tunnel_drip_rainbow", summary="Rainbow drips swirling outward")
+register(
+    "tunnel_drip_rainbow_reverse",
+    "animations:tunnel_drip_rainbow_reverse",
+    summary="Rainbow drips swirling inward",
+)
+register("snowing", "snow:snowing", summary="Snow piling up until the matrix is full")
+register("snow_over_rainbow", "effects.shows:snow_over_rainbow", summary="Snow over the rainbow tunnel")
+
+# Drivers fed from outside the process
+register("ddp", "effects.sources:network", "driver", defaults={"protocol": "ddp"}, summary="Frames received over DDP")
+register("e131", "effects.sources:network", "driver", defaults={"protocol": "e131"}, summary="Frames received over E1.31/sACN")
+register("ring", "effects.sources:shared_memory", "driver", summary="Frames written to the shared-memory ring")
+
+# Synchronized playback across controllers (sync.py)
+register("lead", "sync:lead", "driver", summary="Play an effect and keep the show clock for followers")
+register("follow", "sync:follow", "driver", summary="Play the leader's effect in step with it")
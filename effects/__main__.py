@@ -0,0 +1,46 @@
+"""
+Runs any registered effect by name:
+
+    python -m effects drip color=255,0,0 wait=0.05
+    python -m effects rainbow_cycle --loop --fps 30
+    python -m effects --list
+"""
+
+import argparse
+
+from effects import REGISTRY, clear, get_effect, parse_value, run, strip
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m effects", description="Run an LED effect by name")
+    parser.add_argument("effect", nargs="?", help="Effect name, see --list")
+    parser.add_argument("params", nargs="*", metavar="key=value", help="Effect parameters")
+    parser.add_argument("--list", action="store_true", help="List the effects and exit")
+    parser.add_argument("--fps", type=float, default=20)
+    parser.add_argument("--brightness", type=float, default=0.5)
+    parser.add_argument("--loop", action="store_true", help="Restart the effect when it ends")
+    args = parser.parse_args(argv)
+
+    if args.list or not args.effect:
+        width = max(map(len, REGISTRY))
+        for effect in REGISTRY.values():
+            print(f"{effect.name:<{width}}  {effect.summary}")
+        return
+    try:
+        get_effect(args.effect)
+        params = dict(param.split("=", 1) for param in args.params)
+    except (KeyError, ValueError) as e:
+        parser.error(str(e).strip("'\""))
+    params = {key: parse_value(value) for key, value in params.items()}
+
+    output = strip(args.brightness)
+    try:
+        run(args.effect, args.fps, args.loop, output_strip=output, **params)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        clear(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""
+Effects built from several animations at once.
+"""
+
+import functools
+
+import animations
+from compositor import Compositor
+from renderpool import render_in_process
+
+
+def snow_over_rainbow(layout, fps=animations.FPS):
+    """
+    Snowing on top of the rainbow tunnel, blended by the compositor. The tunnel renders
+    ahead in a worker process so it doesn't hold up the output.
+    """
+    show = Compositor(layout.num_pixels)
+    tunnel = functools.partial(animations.tunnel_drip_rainbow, layout, fps=fps)
+    show.add(render_in_process(tunnel, layout.num_pixels), background=True)
+    show.add(animations.snowing(layout, fps=fps), "alpha")
+    return show.frames()
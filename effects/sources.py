@@ -0,0 +1,33 @@
+"""
+Drivers that show frames produced outside this process.
+"""
+
+
+def network(layout, strip, fps, protocol="ddp", port=None, universe=1, report=5):
+    """
+    Shows frames received over DDP or E1.31 (see ingest.py).
+    """
+    from ingest import FrameReceiver
+
+    receiver = FrameReceiver(layout.num_pixels, protocol=protocol, port=port, start_universe=universe)
+    print(f"Listening for {protocol} on {receiver.address[0]}:{receiver.address[1]}")
+    try:
+        receiver.run(strip, fps, report_every=report)
+    finally:
+        print(receiver.summary())
+        receiver.close()
+
+
+def shared_memory(layout, strip, fps, segment=None, slots=3):
+    """
+    Shows frames written to the shared-memory frame ring named `segment` (see framering.py).
+    """
+    from framering import RING_NAME, FrameRing, RingOutput
+
+    with FrameRing(segment or RING_NAME, layout.num_pixels, slots=slots, create=True) as ring:
+        output = RingOutput(ring, strip)
+        print(f"Waiting for frames on /dev/shm/{ring.name}")
+        try:
+            output.run(fps)
+        finally:
+            print(output.summary())
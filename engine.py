@@ -0,0 +1,329 @@
+"""
+Non-blocking effect engine.
+
+Effects are frame generators (see animations.py) and a single asyncio event loop pulls
+one frame from the current effect per tick, writes it to the strip and waits for the
+next frame deadline. Because effects never sleep, switching effects is instant: `play`
+preempts the current effect at the next frame, optionally crossfading from it, and
+commands arrive concurrently over a small line-based TCP protocol, all on one thread.
+
+    python engine.py              # run the playlist, listening for commands on port 7890
+    echo "play drip color=255,0,0 fade=1" | nc localhost 7890
+
+Commands: play NAME [key=value ...] [fade=SECONDS], next, stop [SECONDS],
+brightness VALUE, status, list, profile.
+"""
+
+import asyncio
+import functools
+import random
+import time
+from itertools import repeat
+
+import numpy as np
+
+from effects import REGISTRY, frames, parse_value
+from framebuffer import write_frame
+from pipeline import pipeline
+from profiler import PROFILE_ENV, profiler_from_env
+from scheduler import FrameClock
+
+COMMAND_HOST = "127.0.0.1"
+COMMAND_PORT = 7890
+
+
+def _close(effect):
+    close = getattr(effect, "close", None)
+    if close is not None:
+        close()
+
+
+def _next_frame(effect, name):
+    """
+    Returns the effect's next frame, or None when it has ended or failed. A failing effect
+    is reported and treated as ended, so it can't stop the engine.
+    """
+    try:
+        return next(effect, None)
+    except Exception as e:
+        print(f"Effect {name or '-'} failed: {e!r}")
+        return None
+
+
+def _started(first, effect):
+    """
+    The effect with its already rendered first frame put back in front.
+    """
+    try:
+        yield first
+        yield from effect
+    finally:
+        _close(effect)
+
+
+class EffectEngine:
+    """
+    Plays frame generators on a strip from an asyncio event loop.
+
+    Parameters:
+    - strip: The strip to draw on.
+    - layout: The `layout.Layout` effects are created for.
+    - fps: Frames per second the effects are pulled and shown at.
+    - effects: Name -> `function(layout, **params)` mapping used by `command`; defaults
+      to every frame effect in the `effects` registry.
+    - stages: Pipeline stages (see pipeline.py) applied to every frame shown, e.g.
+      `limit_brightness(0.4)` or `gamma()`.
+    - profiler: Optional FrameProfiler (see profiler.py) timing every frame's phases.
+    """
+
+    def __init__(self, strip, layout, fps=20, effects=None, stages=(), profiler=None):
+        if effects is None:
+            effects = {
+                name: functools.partial(frames, name)
+                for name, effect in REGISTRY.items()
+                if effect.kind == "frames"
+            }
+        self.strip = strip
+        self.layout = layout
+        self.effects = effects
+        self.stages = stages
+        self.profiler = profiler
+        self.clock = FrameClock(fps)
+        self.name = None
+        self._current = None
+        self._outgoing = None
+        self._fade_frames = 0
+        self._fade_frame = 0
+        self._output = np.zeros((layout.num_pixels, 3), dtype=np.uint8)
+        self._blend = np.zeros(self._output.shape, dtype=np.float32)
+        self._finished = asyncio.Event()
+
+    def play(self, effect, name=None, crossfade=0.0):
+        """
+        Switches to `effect`, an iterator of (N, 3) frames, at the next frame.
+
+        Parameters:
+        - effect: The new effect, e.g. `animations.drip(layout, color)`.
+        - name: Name reported by `status`.
+        - crossfade: Seconds to blend from what is showing now into the new effect.
+        """
+        if self._outgoing is not None:
+            _close(self._outgoing)
+            self._outgoing = None
+        if crossfade > 0:
+            # Keep the old effect running underneath; once it has ended, fade from its last frame
+            self._outgoing = self._current or repeat(self._output.copy())
+            self._fade_frames = max(1, round(crossfade * self.clock.fps))
+            self._fade_frame = 0
+        elif self._current is not None:
+            _close(self._current)
+        self._current = iter(effect)
+        self.name = name
+        self._finished.clear()
+
+    def stop(self, crossfade=0.0):
+        """
+        Fades to black and stays dark until the next `play`.
+        """
+        self.play(repeat(np.zeros_like(self._output)), crossfade=crossfade)
+
+    def skip(self):
+        """
+        Reports the current effect as finished so a playlist moves on. It keeps running
+        until the next `play`, which can crossfade out of it.
+        """
+        self._finished.set()
+
+    def _end_current(self):
+        if self._current is not None:
+            _close(self._current)
+        self._current = None
+        self.name = None
+        self._finished.set()
+
+    async def wait(self):
+        """
+        Waits until the current effect has ended.
+        """
+        await self._finished.wait()
+
+    def render(self):
+        """
+        Advances the effects by one frame and returns the frame to show. A finished effect
+        leaves its last frame showing.
+        """
+        frame = None
+        if self._current is not None:
+            frame = _next_frame(self._current, self.name)
+            if frame is None:
+                self._end_current()
+        if self._outgoing is None:
+            if frame is not None:
+                self._output[:] = frame
+            return self._output
+
+        old = _next_frame(self._outgoing, "fading out")
+        self._fade_frame += 1
+        alpha = self._fade_frame / self._fade_frames
+        np.multiply(self._output if old is None else old, 1.0 - alpha, out=self._blend)
+        self._blend += (self._output if frame is None else frame) * np.float32(alpha)
+        np.rint(self._blend, out=self._blend)
+        self._output[:] = self._blend
+        if self._fade_frame >= self._fade_frames:
+            _close(self._outgoing)
+            self._outgoing = None
+        return self._output
+
+    def _rendered(self):
+        while True:
+            yield self.render()
+
+    async def run(self, frames=None):
+        """
+        Shows one frame per tick until cancelled (or `frames` ticks have passed). Effects
+        advance through ticks the clock dropped, so they keep their speed when behind.
+        """
+        profiler = self.profiler
+        if profiler is not None:
+            return await self._run_profiled(profiler, frames)
+        shown = pipeline(self._rendered(), *self.stages)
+        last = -1
+        async for frame_number in self.clock.aframes(frames):
+            for _ in range(frame_number - last - 1):
+                self.render()
+            last = frame_number
+            write_frame(self.strip, next(shown))
+            self.strip.show()
+
+    async def _run_profiled(self, profiler, frames):
+        """
+        `run` with every phase of the frame timed by `profiler`.
+        """
+        shown = profiler.timed("post", pipeline(profiler.timed("render", self._rendered()), *self.stages))
+        last = -1
+        waited = time.perf_counter()
+        async for frame_number in self.clock.aframes(frames):
+            profiler.record("wait", time.perf_counter() - waited)
+            if profiler.effect != (self.name or "-"):
+                profiler.begin(self.name or "-")
+            dropped = frame_number - last - 1
+            if dropped:
+                profiler.count_dropped(dropped)
+            for _ in range(dropped):
+                self.render()
+            last = frame_number
+            frame = next(shown)
+            start = time.perf_counter()
+            write_frame(self.strip, frame)
+            self.strip.show()
+            waited = time.perf_counter()
+            profiler.record("show", waited - start)
+            profiler.shown(frame)
+
+    def command(self, line):
+        """
+        Executes one text command and returns the reply.
+        """
+        words = line.split()
+        if not words:
+            return ""
+        verb, args = words[0].lower(), words[1:]
+        try:
+            if verb == "play":
+                if not args or args[0] not in self.effects:
+                    return f"error: unknown effect, expected one of {', '.join(self.effects)}"
+                kwargs = dict(arg.split("=", 1) for arg in args[1:])
+                kwargs = {key: parse_value(value) for key, value in kwargs.items()}
+                crossfade = float(kwargs.pop("fade", 0.0))
+                kwargs.setdefault("fps", self.clock.fps)
+                effect = iter(self.effects[args[0]](self.layout, **kwargs))
+                try:
+                    # Render the first frame now so bad parameters are reported to the client
+                    first = next(effect)
+                except StopIteration:
+                    return f"error: {args[0]} has no frames"
+                except Exception as e:
+                    _close(effect)
+                    return f"error: {e}"
+                self.play(_started(first, effect), args[0], crossfade)
+            elif verb == "next":
+                self.skip()
+            elif verb == "stop":
+                self.stop(float(args[0]) if args else 0.0)
+            elif verb == "brightness":
+                self.strip.brightness = min(1.0, max(0.0, float(args[0])))
+            elif verb == "status":
+                return f"ok {self.name or '-'}: {self.clock.summary()}"
+            elif verb == "list":
+                return "ok " + " ".join(self.effects)
+            elif verb == "profile":
+                if self.profiler is None:
+                    return f"error: profiling is off, set ${PROFILE_ENV} to enable it"
+                return "ok " + self.profiler.json()
+            else:
+                return f"error: unknown command {verb!r}"
+        except (TypeError, ValueError, IndexError) as e:
+            return f"error: {e}"
+        return "ok"
+
+    async def serve(self, host=COMMAND_HOST, port=COMMAND_PORT):
+        """
+        Accepts commands, one per line, from any number of TCP clients.
+        """
+
+        async def handle(reader, writer):
+            try:
+                async for line in reader:
+                    reply = self.command(line.decode(errors="replace"))
+                    if reply:
+                        writer.write(reply.encode() + b"\n")
+                        await writer.drain()
+            except (ConnectionError, asyncio.CancelledError):
+                # Client went away, or the server is shutting down
+                pass
+            finally:
+                writer.close()
+
+        server = await asyncio.start_server(handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+async def run_show(engine, playlist, crossfade=0.5, port=COMMAND_PORT, shuffle=False):
+    """
+    Runs the engine, the command server and a playlist together until cancelled.
+
+    Parameters:
+    - engine: The EffectEngine.
+    - playlist: List of (name, factory) pairs; each factory returns a new effect.
+    - crossfade: Seconds to crossfade between playlist entries.
+    - port: Command port, or None to not accept commands.
+    - shuffle: Play the entries in random order.
+    """
+    tasks = [asyncio.create_task(engine.run())]
+    if port is not None:
+        tasks.append(asyncio.create_task(engine.serve(port=port)))
+    try:
+        while True:
+            entries = random.sample(playlist, len(playlist)) if shuffle else playlist
+            for name, factory in entries:
+                print(f"Running effect: {name}")
+                engine.play(factory(), name, crossfade)
+                await engine.wait()
+            print(f"  {engine.clock.summary()}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def main():
+    import effects
+    import fullTest
+
+    engine = EffectEngine(effects.strip(), effects.layout(), profiler=profiler_from_env())
+    asyncio.run(run_show(engine, fullTest.playlist(engine.clock.fps)))
+
+
+if __name__ == "__main__":
+    main()
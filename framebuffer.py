@@ -0,0 +1,228 @@
+import numpy as np
+
+
+def layout_map(num_rows, num_cols, pixel_index=None):
+    """
+    Builds a (num_rows, num_cols) array holding the strip index of every matrix cell.
+
+    Parameters:
+    - num_rows: Number of rows in the matrix.
+    - num_cols: Number of columns in the matrix.
+    - pixel_index: Function mapping (x, y) to the 1D NeoPixel index. Defaults to
+      plain row-major order.
+    """
+    if pixel_index is None:
+        return np.arange(num_rows * num_cols, dtype=np.intp).reshape(num_rows, num_cols)
+    return np.array(
+        [[pixel_index(x, y) for y in range(num_cols)] for x in range(num_rows)], dtype=np.intp
+    )
+
+
+class FrameBuffer:
+    """
+    A whole frame of LED colors held as an (N, bpp) uint8 array in strip order.
+
+    Effects render into `pixels` with array operations and then push the finished frame
+    to the strip with a single `show()` call instead of one `__setitem__` per LED.
+    Matrix effects can write a (num_rows, num_cols, bpp) image through `set_grid`,
+    which applies the zigzag layout with one fancy-indexed copy, and write strided,
+    masked or indexed pixels through `set_pixels`.
+    """
+
+    def __init__(self, num_rows, num_cols, pixel_index=None, bpp=3, index_map=None):
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.num_pixels = num_rows * num_cols
+        self.bpp = bpp
+        if index_map is None:
+            index_map = layout_map(num_rows, num_cols, pixel_index)
+        elif index_map.shape != (num_rows, num_cols):
+            raise ValueError(f"index map of shape {index_map.shape} for a {num_rows}x{num_cols} frame")
+        self.index_map = index_map
+        self.pixels = np.zeros((self.num_pixels, bpp), dtype=np.uint8)
+
+    @classmethod
+    def for_layout(cls, layout, bpp=3):
+        """
+        Creates a frame buffer for a compiled `layout.Layout`, reusing its index map.
+        """
+        return cls(layout.num_rows, layout.num_cols, bpp=bpp, index_map=layout.index_map)
+
+    def __len__(self):
+        return self.num_pixels
+
+    def fill(self, color):
+        self.pixels[:] = color
+
+    def clear(self):
+        self.pixels.fill(0)
+
+    def set_pixels(self, where, colors):
+        """
+        Writes one color, or one color per selected pixel, to many pixels in a single
+        array operation instead of one assignment per pixel.
+
+        Parameters:
+        - where: The pixels to write, in strip order: an index, a slice (e.g.
+          `slice(offset, None, 3)` for every third pixel), an array or list of indices,
+          or a boolean mask of length N. A (num_rows, num_cols) boolean mask selects
+          pixels in matrix coordinates.
+        - colors: One RGB(W) color, or an (M, bpp) array of colors, one per selected pixel
+          in the order they are selected.
+        """
+        if isinstance(where, list):
+            where = np.asarray(where) if where else np.empty(0, dtype=np.intp)
+        if isinstance(where, np.ndarray) and where.dtype == bool and where.ndim == 2:
+            where = self.index_map[where]
+        self.pixels[where] = colors
+
+    def set_grid(self, image):
+        """
+        Writes a (num_rows, num_cols, bpp) image in matrix coordinates into the frame.
+        """
+        self.pixels[self.index_map] = image
+
+    def get_grid(self):
+        """
+        Returns a copy of the frame as a (num_rows, num_cols, bpp) image in matrix coordinates.
+        """
+        return self.pixels[self.index_map]
+
+    def write(self, strip):
+        """
+        Copies the frame into the strip's buffer without sending it.
+        """
+        write_frame(strip, self.pixels)
+
+    def show(self, strip):
+        """
+        Copies the frame into the strip's buffer and sends it.
+        """
+        write_frame(strip, self.pixels)
+        strip.show()
+
+
+def write_frame(strip, frame):
+    """
+    Copies an (N, bpp) RGB(W) frame into a NeoPixel strip's byte buffer in one shot,
+    applying the strip's pixel order and brightness the same way `__setitem__` would.
+    An RGB frame on an RGBW strip leaves the white LEDs off, like a 3-tuple color does.
+
+    Parameters:
+    - strip: A `neopixel.NeoPixel` (or compatible) object.
+    - frame: uint8 array of shape (N, 3) or (N, 4) in strip order, N <= len(strip).
+    """
+    if hasattr(strip, "write_frame"):
+        # Canvases spanning several strips split the frame themselves
+        strip.write_frame(frame)
+        return
+
+    post = getattr(strip, "_post_brightness_buffer", None)
+    if post is None:
+        # Older neopixel releases without a pixel buffer: fall back to one slice write
+        strip[0:len(frame)] = [tuple(color) for color in frame.tolist()]
+        return
+
+    bpp = strip._bpp
+    offset = strip._offset
+    channels = min(frame.shape[1], bpp)
+    if channels < 3:
+        raise ValueError(f"expected an (N, 3) or (N, 4) RGB(W) frame, got shape {frame.shape}")
+    if channels < bpp:
+        # RGB frame on an RGBW strip: white stays off
+        ordered = np.zeros((len(frame), bpp), dtype=np.uint8)
+    else:
+        ordered = np.empty((len(frame), bpp), dtype=np.uint8)
+    ordered[:, list(strip._byteorder[:channels])] = frame[:, :channels]
+    span = slice(offset, offset + ordered.size)
+
+    if strip._pre_brightness_buffer is not None:
+        strip._pre_brightness_buffer[span] = ordered.tobytes()
+    brightness = strip.brightness
+    if brightness < 1.0:
+        ordered = (ordered * brightness).astype(np.uint8)
+    post[span] = ordered.tobytes()
+
+
+class ChangeTrackingStrip:
+    """
+    Wraps a NeoPixel strip so `show()` only clocks a frame out when it differs from the
+    last frame actually sent.
+
+    Every write path (`__setitem__`, `fill`, or `write_frame` copying straight into the
+    byte buffer) is covered, because the check compares the strip's output buffer with a
+    snapshot of the last sent frame, which is a single memcmp. Counts of sent and skipped
+    frames are kept for diagnostics.
+
+    Parameters:
+    - strip: A `neopixel.NeoPixel` (or compatible) object.
+    """
+
+    def __init__(self, strip):
+        self.strip = strip
+        self._last_sent = None
+        self.frames_sent = 0
+        self.frames_skipped = 0
+
+    def __getattr__(self, name):
+        return getattr(self.strip, name)
+
+    def __len__(self):
+        return len(self.strip)
+
+    def __getitem__(self, index):
+        return self.strip[index]
+
+    def __setitem__(self, index, value):
+        self.strip[index] = value
+
+    def fill(self, color):
+        self.strip.fill(color)
+
+    @property
+    def brightness(self):
+        return self.strip.brightness
+
+    @brightness.setter
+    def brightness(self, value):
+        self.strip.brightness = value
+
+    def _output_buffer(self):
+        buf = getattr(self.strip, "_post_brightness_buffer", None)
+        if buf is None:
+            buf = getattr(self.strip, "buf", None)
+        return buf
+
+    def show(self):
+        """
+        Sends the frame if it changed since the last one sent. Returns True if it was sent.
+        """
+        buf = self._output_buffer()
+        if buf is not None and self._last_sent is not None and buf == self._last_sent:
+            self.frames_skipped += 1
+            return False
+        self.strip.show()
+        self._last_sent = bytes(buf) if buf is not None else None
+        self.frames_sent += 1
+        return True
+
+    def invalidate(self):
+        """
+        Forces the next `show()` to send, e.g. after the strip was power cycled.
+        """
+        self._last_sent = None
+
+    def reset_stats(self):
+        self.frames_sent = 0
+        self.frames_skipped = 0
+
+    def stats(self):
+        """
+        Returns a dict with the number of frames sent and skipped as unchanged.
+        """
+        total = self.frames_sent + self.frames_skipped
+        return {
+            "frames_sent": self.frames_sent,
+            "frames_skipped": self.frames_skipped,
+            "skip_ratio": self.frames_skipped / total if total else 0.0,
+        }
@@ -0,0 +1,220 @@
+"""
+Shared-memory frame ring for driving the strip from other processes.
+
+An output daemon creates a named shared-memory segment holding a few frame slots.
+Producers (video decoders, audio analyzers, other scripts) attach to it by name and
+write frames straight into the next slot, then publish the slot's sequence number. The
+daemon shows only the newest published frame on each tick, so a fast producer never
+blocks and a slow one never stalls the output: latest frame wins.
+
+    python framering.py --fps 60                 # output daemon on the configured strip
+
+    ring = FrameRing(RING_NAME)                  # in a producer process
+    for frame in animations.rainbow_cycle(LAYOUT):
+        ring.write(frame)                        # or render into ring.next_slot(), then publish()
+
+There is one producer per ring. A frame is never locked: the reader checks the slot's
+sequence number again after copying it into the strip buffer and throws the copy away
+if the producer has lapped the ring and overwritten it in the meantime.
+
+Segment layout (little endian), usable from any language via /dev/shm/<name>:
+
+    header      magic b"NPXR", uint8 version, uint8 bpp, uint16 slots, uint32 num_pixels,
+                uint32 reserved, uint64 latest sequence (0 = nothing published yet)
+    sequences   uint64[slots], the sequence number of the frame in each slot
+    frames      uint8[slots][num_pixels][bpp] RGB(W) in strip order;
+                frame n lives in slot n % slots
+"""
+
+import argparse
+import struct
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from framebuffer import write_frame
+from scheduler import FrameClock
+
+RING_NAME = "neopixel-frames"
+MAGIC = b"NPXR"
+VERSION = 1
+# magic, version, bpp, slots, num_pixels, reserved; the latest sequence number follows
+HEADER = struct.Struct("<4sBBHII")
+LATEST_OFFSET = HEADER.size
+
+
+class FrameRing:
+    """
+    A named shared-memory ring of frames.
+
+    Parameters:
+    - name: Name of the shared-memory segment.
+    - num_pixels: Pixels per frame; required when creating the ring.
+    - bpp: Bytes per pixel.
+    - slots: Number of frame slots; 3 lets the producer finish a frame while the reader
+      copies the previous one.
+    - create: Create the segment (the output daemon) instead of attaching to it.
+    """
+
+    def __init__(self, name=RING_NAME, num_pixels=None, bpp=3, slots=3, create=False):
+        self.owner = create
+        if create:
+            size = LATEST_OFFSET + 8 * (1 + slots) + slots * num_pixels * bpp
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            HEADER.pack_into(self._shm.buf, 0, MAGIC, VERSION, bpp, slots, num_pixels, 0)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            # Before Python 3.13 attaching also registers the segment for cleanup, which
+            # would delete the ring as soon as a producer exits
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+            magic, version, bpp, slots, num_pixels, _ = HEADER.unpack_from(self._shm.buf)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{name} is not a version {VERSION} frame ring")
+
+        self.name = name
+        self.num_pixels = num_pixels
+        self.bpp = bpp
+        self.slots = slots
+        buf = self._shm.buf
+        self._latest = np.ndarray((1,), dtype="<u8", buffer=buf, offset=LATEST_OFFSET)
+        self._sequences = np.ndarray((slots,), dtype="<u8", buffer=buf, offset=LATEST_OFFSET + 8)
+        self._frames = np.ndarray(
+            (slots, num_pixels, bpp), dtype=np.uint8, buffer=buf, offset=LATEST_OFFSET + 8 * (1 + slots)
+        )
+        self._pending = None
+
+    @property
+    def sequence(self):
+        """
+        Sequence number of the newest published frame (0 before the first one).
+        """
+        return int(self._latest[0])
+
+    # Producer side
+
+    def next_slot(self):
+        """
+        Returns the (num_pixels, bpp) slot the next frame goes into, for rendering in place.
+        """
+        sequence = self.sequence + 1
+        self._pending = sequence
+        # Mark the slot as being rewritten so a reader that is still copying it notices
+        self._sequences[sequence % self.slots] = 0
+        return self._frames[sequence % self.slots]
+
+    def publish(self):
+        """
+        Publishes the frame rendered into `next_slot()`.
+        """
+        sequence = self._pending
+        self._sequences[sequence % self.slots] = sequence
+        self._latest[0] = sequence
+        self._pending = None
+        return sequence
+
+    def write(self, frame):
+        """
+        Copies a frame into the next slot and publishes it. Returns its sequence number.
+        """
+        self.next_slot()[:] = np.asarray(frame, dtype=np.uint8).reshape(self.num_pixels, self.bpp)
+        return self.publish()
+
+    # Consumer side
+
+    def latest(self, since=0):
+        """
+        Returns (sequence, frame) for the newest frame if it is newer than `since`, otherwise
+        (since, None). The frame is a view into shared memory: check `valid(sequence)` after
+        reading it.
+        """
+        sequence = self.sequence
+        if sequence <= since:
+            return since, None
+        return sequence, self._frames[sequence % self.slots]
+
+    def valid(self, sequence):
+        """
+        True while frame `sequence` has not been overwritten by the producer.
+        """
+        return int(self._sequences[sequence % self.slots]) == sequence
+
+    def close(self):
+        self._latest = self._sequences = self._frames = None
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.close()
+
+
+class RingOutput:
+    """
+    Output daemon loop: shows the newest frame of a FrameRing on a strip.
+
+    Parameters:
+    - ring: The FrameRing to read.
+    - strip: Strip to write to, e.g. from `backend.create_strip`.
+    """
+
+    def __init__(self, ring, strip):
+        self.ring = ring
+        self.strip = strip
+        self.last_sequence = ring.sequence
+        self.frames_shown = 0
+        self.frames_superseded = 0  # Published but replaced by a newer frame before shown
+        self.torn_reads = 0  # Overwritten while being copied, retried on the next tick
+
+    def step(self):
+        """
+        Shows the newest frame if there is one. Returns True if a frame was shown.
+        """
+        sequence, frame = self.ring.latest(self.last_sequence)
+        if frame is None:
+            return False
+        write_frame(self.strip, frame)
+        if not self.ring.valid(sequence):
+            self.torn_reads += 1
+            return False
+        self.strip.show()
+        self.frames_superseded += sequence - self.last_sequence - 1
+        self.last_sequence = sequence
+        self.frames_shown += 1
+        return True
+
+    def run(self, fps=60, clock=None):
+        """
+        Checks for a new frame once per tick until interrupted.
+        """
+        clock = clock or FrameClock(fps)
+        for _ in clock.frames(fps=fps):
+            self.step()
+
+    def summary(self):
+        return (
+            f"{self.frames_shown} shown, {self.frames_superseded} superseded, "
+            f"{self.torn_reads} torn reads"
+        )
+
+
+def main(argv=None):
+    import effects
+
+    parser = argparse.ArgumentParser(description="Show frames written to a shared-memory ring")
+    parser.add_argument("--name", default=RING_NAME, help="Shared-memory segment name")
+    parser.add_argument("--slots", type=int, default=3)
+    parser.add_argument("--fps", type=float, default=60)
+    args = parser.parse_args(argv)
+
+    # Same as `python -m effects ring`: the layout's strip on $NEOPIXEL_PIN
+    try:
+        effects.run("ring", args.fps, segment=args.name, slots=args.slots)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
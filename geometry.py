@@ -0,0 +1,63 @@
+from functools import lru_cache
+
+
+def center_cells(num_rows, num_cols):
+    """
+    Returns the LEDs at the middle of a matrix: the 2x2 block for even dimensions
+    (e.g. [(4, 4), (4, 5), (5, 4), (5, 5)] on a 10x10 grid), a single row or column
+    of the block for odd ones.
+    """
+    rows = [num_rows // 2] if num_rows % 2 else [num_rows // 2 - 1, num_rows // 2]
+    cols = [num_cols // 2] if num_cols % 2 else [num_cols // 2 - 1, num_cols // 2]
+    return [(x, y) for x in rows for y in cols]
+
+
+def _manhattan_distance(x, y, centers):
+    """
+    Manhattan distance from (x, y) to the closest of the given center LEDs.
+    """
+    return min(abs(x - cx) + abs(y - cy) for cx, cy in centers)
+
+
+@lru_cache(maxsize=None)
+def _build_rings(num_rows, num_cols, centers, pixel_index):
+    rings = {}
+    for x in range(num_rows):
+        for y in range(num_cols):
+            distance = _manhattan_distance(x, y, centers)
+            rings.setdefault(distance, []).append(pixel_index(x, y))
+    return tuple(tuple(rings.get(distance, ())) for distance in range(max(rings) + 1))
+
+
+@lru_cache(maxsize=None)
+def _build_ring_arrays(num_rows, num_cols, centers, pixel_index):
+    import numpy as np
+
+    rings = _build_rings(num_rows, num_cols, centers, pixel_index)
+    return tuple(np.array(indices, dtype=np.intp) for indices in rings)
+
+
+def ring_arrays(num_rows, num_cols, centers, pixel_index):
+    """
+    Builds the ring table for a matrix layout: entry `d` is a NumPy array of the strip
+    indices of every LED whose Manhattan distance to the center region is `d`, already
+    passed through `pixel_index`, so a whole ring can be written into a frame with a
+    single fancy-indexed assignment. The table is computed once per layout and cached.
+
+    Parameters:
+    - num_rows: Number of rows in the matrix.
+    - num_cols: Number of columns in the matrix.
+    - centers: List of (x, y) center LEDs the rings expand from.
+    - pixel_index: Function mapping (x, y) to the 1D NeoPixel index.
+    """
+    return _build_ring_arrays(num_rows, num_cols, tuple(centers), pixel_index)
+
+
+def ring(rings, distance):
+    """
+    Returns the strip indices lit by the ring at `distance`, or an empty sequence when
+    the ring lies outside the matrix.
+    """
+    if 0 <= distance < len(rings):
+        return rings[distance]
+    return rings[0][:0]
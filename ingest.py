@@ -0,0 +1,369 @@
+"""
+Network frame ingest: show frames sent by lighting software over UDP.
+
+Two standard protocols are understood:
+- DDP (Distributed Display Protocol, port 4048): each packet carries a byte offset into
+  the frame; the packet with the PUSH flag completes the frame.
+- E1.31 / sACN (port 5568, unicast): each universe carries 170 RGB (128 RGBW) pixels,
+  consecutive universes from `start_universe` cover the strip, and the universe holding
+  the last pixel completes the frame.
+
+Packets are received with `recv_into` into one preallocated buffer and their pixel data
+copied straight to its place in the incoming frame, so there is no per-packet
+allocation. A completed frame is copied once into the frame that is shown, and the
+output runs at its own frame rate: bursts of frames arriving between two ticks are
+coalesced and only the newest is shown. Packet loss (from the protocol sequence
+numbers) and receive-to-show latency are counted.
+
+    python ingest.py --protocol ddp                          # receive and show
+    python ingest.py --send rainbow_cycle --protocol ddp     # loopback test sender
+"""
+
+import argparse
+import math
+import select
+import socket
+import struct
+import time
+
+import numpy as np
+
+from framebuffer import write_frame
+
+PROTOCOLS = ("ddp", "e131")
+DEFAULT_PORTS = {"ddp": 4048, "e131": 5568}
+
+DDP_HEADER = struct.Struct("!BBBBIH")  # flags, sequence, data type, id, offset, length
+DDP_VERSION = 0x40
+DDP_PUSH = 0x01
+DDP_QUERY = 0x02
+DDP_REPLY = 0x04
+DDP_TIMECODE = 0x10
+DDP_MAX_DATA = 1440  # Payload that keeps a packet within a standard Ethernet MTU
+
+E131_ID = b"ASC-E1.17\0\0\0"
+E131_ROOT = struct.Struct("!HH12sHI16s")  # preamble, postamble, id, flags/length, vector, CID
+E131_FRAMING = struct.Struct("!HI64sBHBBH")  # flags/length, vector, source, priority, sync, seq, options, universe
+E131_DMP = struct.Struct("!HBBHHHB")  # flags/length, vector, type, first address, increment, count, start code
+E131_DATA = E131_ROOT.size + E131_FRAMING.size + E131_DMP.size  # 126
+E131_PREVIEW = 0x80
+E131_CHANNELS = 512
+
+
+def universe_pixels(bpp):
+    """
+    Pixels per E1.31 universe: as many whole pixels as fit in 512 channels.
+    """
+    return E131_CHANNELS // bpp
+
+
+class FrameReceiver:
+    """
+    Receives frames over UDP and shows the newest complete one on each output tick.
+
+    Parameters:
+    - num_pixels: Strip length.
+    - bpp: Bytes per pixel of the incoming data (RGB or RGBW, strip order).
+    - protocol: "ddp" or "e131".
+    - port: UDP port, defaults to the protocol's standard port.
+    - host: Address to listen on.
+    - start_universe: First E1.31 universe of the strip.
+    """
+
+    def __init__(self, num_pixels, bpp=3, protocol="ddp", port=None, host="0.0.0.0", start_universe=1):
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"protocol must be one of {PROTOCOLS}, got {protocol!r}")
+        self.num_pixels = num_pixels
+        self.bpp = bpp
+        self.protocol = protocol
+        self.start_universe = start_universe
+        self.last_universe = start_universe + (num_pixels - 1) // universe_pixels(bpp)
+
+        self._incoming = np.zeros(num_pixels * bpp, dtype=np.uint8)
+        self.frame = np.zeros((num_pixels, bpp), dtype=np.uint8)
+        self._packet = bytearray(65536)
+        self._packet_view = memoryview(self._packet)
+        self._sequences = {}
+
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind((host, port or DEFAULT_PORTS[protocol]))
+        self.socket.setblocking(False)
+        self.address = self.socket.getsockname()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.packets = 0
+        self.packets_lost = 0
+        self.packets_ignored = 0  # Malformed, out of order, preview or query packets
+        self.frames_received = 0
+        self.frames_shown = 0
+        self.frames_superseded = 0  # Completed but replaced by a newer frame before shown
+        self._frame_start = None
+        self._complete_start = None
+        self._received_sequence = 0
+        self._shown_sequence = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    def poll(self):
+        """
+        Handles every packet waiting on the socket. Returns the number handled.
+        """
+        count = 0
+        while True:
+            try:
+                size = self.socket.recv_into(self._packet)
+            except BlockingIOError:
+                return count
+            count += 1
+            self.packets += 1
+            if self._frame_start is None:
+                self._frame_start = time.monotonic()
+            complete = self._handle_ddp(size) if self.protocol == "ddp" else self._handle_e131(size)
+            if complete:
+                self._complete_frame()
+
+    def _count_loss(self, key, sequence, modulo):
+        """
+        Tracks a sequence number; returns False for duplicate or out-of-order packets.
+        """
+        previous = self._sequences.get(key)
+        self._sequences[key] = sequence
+        if previous is None:
+            return True
+        gap = (sequence - previous) % modulo
+        if gap == 0 or gap > modulo - modulo // 12:
+            # Same or slightly older sequence number: a late or repeated packet
+            self._sequences[key] = previous
+            return False
+        self.packets_lost += gap - 1
+        return True
+
+    def _handle_ddp(self, size):
+        packet = self._packet
+        if size < DDP_HEADER.size:
+            self.packets_ignored += 1
+            return False
+        flags, sequence, _, _, offset, length = DDP_HEADER.unpack_from(packet)
+        if flags & 0xC0 != DDP_VERSION or flags & (DDP_QUERY | DDP_REPLY):
+            self.packets_ignored += 1
+            return False
+        sequence &= 0x0F
+        # Sequence numbers run 1-15; 0 means the sender doesn't number its packets
+        if sequence and not self._count_loss("ddp", sequence - 1, 15):
+            self.packets_ignored += 1
+            return False
+        start = DDP_HEADER.size + (4 if flags & DDP_TIMECODE else 0)
+        length = max(0, min(length, size - start, len(self._incoming) - offset))
+        if length:
+            self._incoming[offset:offset + length] = self._packet_view[start:start + length]
+        return bool(flags & DDP_PUSH)
+
+    def _handle_e131(self, size):
+        packet = self._packet
+        if size < E131_DATA or packet[4:16] != E131_ID or packet[E131_DATA - 1] != 0:
+            self.packets_ignored += 1
+            return False
+        _, _, _, _, root_vector, _ = E131_ROOT.unpack_from(packet)
+        _, vector, _, _, _, sequence, options, universe = E131_FRAMING.unpack_from(packet, E131_ROOT.size)
+        if root_vector != 4 or vector != 2 or options & E131_PREVIEW:
+            self.packets_ignored += 1
+            return False
+        if not self.start_universe <= universe <= self.last_universe:
+            self.packets_ignored += 1
+            return False
+        if not self._count_loss(universe, sequence, 256):
+            self.packets_ignored += 1
+            return False
+        channels = struct.unpack_from("!H", packet, E131_DATA - 3)[0] - 1
+        offset = (universe - self.start_universe) * universe_pixels(self.bpp) * self.bpp
+        length = max(0, min(channels, size - E131_DATA, len(self._incoming) - offset))
+        if length:
+            self._incoming[offset:offset + length] = self._packet_view[E131_DATA:E131_DATA + length]
+        return universe == self.last_universe
+
+    def _complete_frame(self):
+        np.copyto(self.frame.reshape(-1), self._incoming)
+        self._complete_start = self._frame_start
+        self._frame_start = None
+        self._received_sequence += 1
+        self.frames_received += 1
+
+    def show(self, strip):
+        """
+        Shows the newest complete frame if it hasn't been shown yet. Returns True if it was.
+        """
+        if self._received_sequence == self._shown_sequence:
+            return False
+        write_frame(strip, self.frame)
+        strip.show()
+        latency = time.monotonic() - self._complete_start
+        self._latency_total += latency
+        self._latency_max = max(self._latency_max, latency)
+        self.frames_superseded += self._received_sequence - self._shown_sequence - 1
+        self._shown_sequence = self._received_sequence
+        self.frames_shown += 1
+        return True
+
+    def run(self, strip, fps=40, report_every=None):
+        """
+        Receives packets between output ticks and shows the newest frame at each tick.
+
+        Parameters:
+        - strip: Strip to show the frames on.
+        - fps: Output frame rate; frames arriving faster are coalesced.
+        - report_every: Print `summary()` every this many seconds.
+        """
+        period = 1.0 / fps
+        next_tick = time.monotonic()
+        next_report = next_tick + report_every if report_every else math.inf
+        while True:
+            timeout = next_tick - time.monotonic()
+            if timeout > 0:
+                if select.select([self.socket], [], [], timeout)[0]:
+                    self.poll()
+                continue
+            self.poll()
+            self.show(strip)
+            now = time.monotonic()
+            next_tick += period
+            if next_tick < now - period:
+                next_tick = now  # Fell more than a frame behind: don't try to catch up
+            if now >= next_report:
+                print(self.summary())
+                next_report = now + report_every
+
+    def stats(self):
+        """
+        Returns a dict with packet and frame counts, loss rate and latency in milliseconds.
+        """
+        expected = self.packets + self.packets_lost
+        return {
+            "packets": self.packets,
+            "packets_lost": self.packets_lost,
+            "packets_ignored": self.packets_ignored,
+            "loss_rate": self.packets_lost / expected if expected else 0.0,
+            "frames_received": self.frames_received,
+            "frames_shown": self.frames_shown,
+            "frames_superseded": self.frames_superseded,
+            "latency_ms": self._latency_total / self.frames_shown * 1000 if self.frames_shown else 0.0,
+            "max_latency_ms": self._latency_max * 1000,
+        }
+
+    def summary(self):
+        s = self.stats()
+        return (
+            f"{s['frames_received']} frames received, {s['frames_shown']} shown, "
+            f"{s['frames_superseded']} coalesced, {s['packets_lost']} packets lost "
+            f"({s['loss_rate']:.2%}), latency {s['latency_ms']:.2f} ms (max {s['max_latency_ms']:.2f} ms)"
+        )
+
+    def close(self):
+        self.socket.close()
+
+
+class FrameSender:
+    """
+    Sends frames with DDP or E1.31, e.g. to test a FrameReceiver over localhost.
+
+    Parameters:
+    - host: Receiver address.
+    - port: UDP port, defaults to the protocol's standard port.
+    - protocol: "ddp" or "e131".
+    - bpp: Bytes per pixel.
+    - start_universe: First E1.31 universe.
+    """
+
+    def __init__(self, host="127.0.0.1", port=None, protocol="ddp", bpp=3, start_universe=1):
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"protocol must be one of {PROTOCOLS}, got {protocol!r}")
+        self.destination = (host, port or DEFAULT_PORTS[protocol])
+        self.protocol = protocol
+        self.bpp = bpp
+        self.start_universe = start_universe
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sequence = 0
+        self._universe_sequences = {}
+
+    def packets(self, frame):
+        """
+        Splits one frame into the protocol's packets.
+        """
+        data = np.ascontiguousarray(frame, dtype=np.uint8).tobytes()
+        if self.protocol == "ddp":
+            # Whole pixels per packet, so a pixel is never split across packets
+            step = DDP_MAX_DATA // self.bpp * self.bpp
+            for offset in range(0, len(data), step):
+                self._sequence = self._sequence % 15 + 1
+                last = offset + step >= len(data)
+                flags = DDP_VERSION | (DDP_PUSH if last else 0)
+                chunk = data[offset:offset + step]
+                yield DDP_HEADER.pack(flags, self._sequence, 1, 1, offset, len(chunk)) + chunk
+            return
+
+        step = universe_pixels(self.bpp) * self.bpp
+        for index, offset in enumerate(range(0, len(data), step)):
+            universe = self.start_universe + index
+            sequence = (self._universe_sequences.get(universe, -1) + 1) % 256
+            self._universe_sequences[universe] = sequence
+            yield _e131_packet(universe, sequence, data[offset:offset + step])
+
+    def send(self, frame):
+        for packet in self.packets(frame):
+            self.socket.sendto(packet, self.destination)
+
+    def close(self):
+        self.socket.close()
+
+
+def _e131_packet(universe, sequence, data, source=b"NeoPixel test sender", cid=bytes(16)):
+    n = len(data)
+    return b"".join(
+        (
+            E131_ROOT.pack(0x0010, 0, E131_ID, 0x7000 | (110 + n), 4, cid),
+            E131_FRAMING.pack(0x7000 | (88 + n), 2, source, 100, 0, sequence, 0, universe),
+            E131_DMP.pack(0x7000 | (11 + n), 2, 0xA1, 0, 1, n + 1, 0),
+            data,
+        )
+    )
+
+
+def main(argv=None):
+    import effects
+
+    parser = argparse.ArgumentParser(description="Show frames received over DDP or E1.31")
+    parser.add_argument("--protocol", choices=PROTOCOLS, default="ddp")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--fps", type=float, default=40, help="Output (or sending) frame rate")
+    parser.add_argument("--universe", type=int, default=1, help="First E1.31 universe")
+    parser.add_argument("--report", type=float, default=5, help="Seconds between stats lines")
+    parser.add_argument("--send", metavar="EFFECT", help="Send an effect instead of receiving")
+    parser.add_argument("--host", default="127.0.0.1", help="Receiver address for --send")
+    parser.add_argument("--frames", type=int, default=1000, help="Frames to send")
+    args = parser.parse_args(argv)
+
+    if args.send:
+        import inspect
+
+        import animations
+        from pipeline import pace, pipeline
+
+        effect = animations.ANIMATIONS[args.send]
+        color_args = ((255, 255, 255),) if "color" in inspect.signature(effect).parameters else ()
+        sender = FrameSender(args.host, args.port, args.protocol, start_universe=args.universe)
+        frames = pipeline(effect(effects.layout(), *color_args, fps=args.fps), pace(args.fps))
+        for _, frame in zip(range(args.frames), frames):
+            sender.send(frame)
+        sender.close()
+        return
+
+    # Same as `python -m effects ddp` (or e131): the layout's strip on $NEOPIXEL_PIN
+    try:
+        effects.run(args.protocol, args.fps, port=args.port, universe=args.universe, report=args.report)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
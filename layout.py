@@ -0,0 +1,142 @@
+"""
+Panel layouts: how matrix coordinates map onto positions along the LED chain.
+
+A layout is a grid of identical tiles. Each tile is wired in rows, either serpentine
+(every other row runs backwards, the usual zigzag matrix) or progressive (every row runs
+the same way), and may be mounted rotated. Tiles are chained one after another, either
+row by row or in a serpentine order, or in an explicit order from the config.
+
+The layout is compiled once into `index_map`, a (num_rows, num_cols) array of strip
+indices, so rendering never calls a per-pixel Python function.
+
+Example layout file for a 4x4 arrangement of 16x16 serpentine tiles:
+
+    {
+        "tile_rows": 16,
+        "tile_cols": 16,
+        "tiles_down": 4,
+        "tiles_across": 4,
+        "serpentine": true,
+        "tile_order": "serpentine"
+    }
+
+Individual tiles can be listed in chain order to override placement and rotation:
+
+    "tiles": [{"row": 0, "col": 0, "rotation": 180}, {"row": 0, "col": 1}, ...]
+"""
+
+import json
+import os
+
+import numpy as np
+
+from geometry import center_cells
+
+LAYOUT_ENV = "NEOPIXEL_LAYOUT"  # Path of the layout file used by the effect scripts
+
+ROTATIONS = (0, 90, 180, 270)
+TILE_ORDERS = ("progressive", "serpentine")
+
+
+def tile_wiring(tile_rows, tile_cols, serpentine=True, rotation=0):
+    """
+    Returns a (tile_rows, tile_cols) array with the position of each LED along a single
+    tile's chain, for a tile mounted rotated clockwise by `rotation` degrees.
+    """
+    if rotation not in ROTATIONS:
+        raise ValueError(f"rotation must be one of {ROTATIONS}, got {rotation!r}")
+    # Wiring before rotation; a quarter turn swaps the tile's rows and columns
+    rows, cols = (tile_rows, tile_cols) if rotation in (0, 180) else (tile_cols, tile_rows)
+    wiring = np.arange(rows * cols, dtype=np.intp).reshape(rows, cols)
+    if serpentine:
+        wiring[1::2] = wiring[1::2, ::-1]
+    return np.rot90(wiring, k=-(rotation // 90))
+
+
+class Layout:
+    """
+    Compiled description of a (possibly tiled) LED matrix.
+
+    Parameters:
+    - tile_rows: Rows of LEDs in one tile.
+    - tile_cols: Columns of LEDs in one tile.
+    - tiles_down: Number of tile rows.
+    - tiles_across: Number of tile columns.
+    - serpentine: Every other LED row runs backwards inside a tile.
+    - rotation: Clockwise rotation in degrees applied to every tile (0, 90, 180, 270).
+    - tile_order: "progressive" chains tile rows left to right; "serpentine" alternates.
+    - tiles: Optional list of {"row", "col", "rotation"} dicts giving each tile's place
+      in chain order, overriding `tile_order` and `rotation`.
+    """
+
+    def __init__(
+        self,
+        tile_rows,
+        tile_cols,
+        tiles_down=1,
+        tiles_across=1,
+        serpentine=True,
+        rotation=0,
+        tile_order="serpentine",
+        tiles=None,
+    ):
+        if tile_order not in TILE_ORDERS:
+            raise ValueError(f"tile_order must be one of {TILE_ORDERS}, got {tile_order!r}")
+        self.tile_rows = tile_rows
+        self.tile_cols = tile_cols
+        self.num_rows = tile_rows * tiles_down
+        self.num_cols = tile_cols * tiles_across
+        self.num_pixels = self.num_rows * self.num_cols
+
+        if tiles is None:
+            tiles = []
+            for tile_row in range(tiles_down):
+                cols = range(tiles_across)
+                if tile_order == "serpentine" and tile_row % 2:
+                    cols = reversed(cols)
+                tiles.extend({"row": tile_row, "col": tile_col} for tile_col in cols)
+        if len(tiles) != tiles_down * tiles_across:
+            raise ValueError(f"expected {tiles_down * tiles_across} tiles, got {len(tiles)}")
+
+        tile_pixels = tile_rows * tile_cols
+        index_map = np.full((self.num_rows, self.num_cols), -1, dtype=np.intp)
+        for chain_position, tile in enumerate(tiles):
+            x = tile["row"] * tile_rows
+            y = tile["col"] * tile_cols
+            wiring = tile_wiring(tile_rows, tile_cols, serpentine, tile.get("rotation", rotation))
+            index_map[x:x + tile_rows, y:y + tile_cols] = wiring + chain_position * tile_pixels
+        if (index_map < 0).any():
+            raise ValueError("tiles do not cover the whole matrix")
+
+        index_map.flags.writeable = False
+        self.index_map = index_map
+        # Plain nested tuples for per-pixel code: PIXEL_INDEX[x][y] without a function call
+        self.index_table = tuple(tuple(row) for row in index_map.tolist())
+        self.centers = center_cells(self.num_rows, self.num_cols)
+
+    def pixel_index(self, x, y):
+        """
+        Converts 2D matrix coordinates (x, y) to the 1D NeoPixel index.
+        """
+        return self.index_table[x][y]
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Builds a layout from a dict or the path of a JSON layout file.
+        """
+        if isinstance(config, (str, os.PathLike)):
+            with open(config) as f:
+                config = json.load(f)
+        return cls(**config)
+
+
+def load_layout(path=None, default_rows=10, default_cols=10):
+    """
+    Loads the layout file at `path` (or $NEOPIXEL_LAYOUT). Without one, returns a single
+    serpentine panel of `default_rows` x `default_cols`, the wiring of the original 10x10 matrix.
+    """
+    path = path or os.environ.get(LAYOUT_ENV)
+    if path:
+        return Layout.from_config(path)
+    return Layout(default_rows, default_cols)
@@ -1,101 +1,77 @@
 import time
-import board
-import neopixel
+import numpy as np
+from colormath import scale_color
+from framebuffer import FrameBuffer
+from palette import wheel_palette
+from scheduler import FrameClock
+from backend import LazyStrip, GRB
 
-# Choose an open pin connected to the Data In of the NeoPixel strip, i.e. board.D18
-pixel_pin = board.D21
+# Choose an open pin connected to the Data In of the NeoPixel strip, i.e. "D18"
+pixel_pin = "D21"
 
 # The number of NeoPixels
 num_pixels = 50
 
 # The order of the pixel colors - RGB or GRB. Some NeoPixels have red and green reversed!
-ORDER = neopixel.GRB
+ORDER = GRB
 
-pixels = neopixel.NeoPixel(
+pixels = LazyStrip(
     pixel_pin, num_pixels, brightness=0.2, auto_write=False, pixel_order=ORDER
 )
 
-# Color Wheel Function
-def wheel(pos):
-    if pos < 0 or pos > 255:
-        r = g = b = 0
-    elif pos < 85:
-        r = int(pos * 3)
-        g = int(255 - pos * 3)
-        b = 0
-    elif pos < 170:
-        pos -= 85
-        r = int(255 - pos * 3)
-        g = 0
-        b = int(pos * 3)
-    else:
-        pos -= 170
-        r = 0
-        g = int(pos * 3)
-        b = int(255 - pos * 3)
-    return (r, g, b) if ORDER in (neopixel.RGB, neopixel.GRB) else (r, g, b, 0)
+# Color wheel, precomputed once for this strip's pixel order (RGB or RGBW)
+PALETTE = wheel_palette(len(ORDER))
+wheel = PALETTE.color
+
+# Frame buffer for effects that render the whole strip at once
+frame = FrameBuffer(1, num_pixels, bpp=len(ORDER))
+
+# Paces frame-based effects to a target FPS with monotonic deadlines
+clock = FrameClock()
 
 # Rainbow Cycle
 def rainbow_cycle(wait):
-    for j in range(255):
-        for i in range(num_pixels):
-            pixel_index = (i * 256 // num_pixels) + j
-            pixels[i] = wheel(pixel_index & 255)
-        pixels.show()
-        time.sleep(wait)
+    hues = np.arange(num_pixels) * 256 // num_pixels
+    for j in clock.frames(255, fps=1 / wait):
+        PALETTE.lookup(hues + j, out=frame.pixels)
+        frame.show(pixels)
 
 # Blink Effect
 def blink(color, wait, times):
-    for _ in range(times):
-        pixels.fill(color)
-        pixels.show()
-        time.sleep(wait)
-        pixels.fill((0, 0, 0))
-        pixels.show()
-        time.sleep(wait)
+    for j in clock.frames(2 * times, fps=1 / wait):
+        if j % 2 == 0:
+            frame.fill(color)
+        else:
+            frame.clear()
+        frame.show(pixels)
 
 # Breathing Effect (fixed)
 def breathe(color, steps, pause):
-    for b in range(steps):
-        scale = b / steps
-        scaled_color = tuple(int(c * scale) for c in color)
-        pixels.fill(scaled_color)
-        pixels.show()
-        time.sleep(pause)
-    for b in range(steps, -1, -1):
-        scale = b / steps
-        scaled_color = tuple(int(c * scale) for c in color)
-        pixels.fill(scaled_color)
-        pixels.show()
-        time.sleep(pause)
+    # Up from 0 to full in `steps` frames, then back down to 0
+    for j in clock.frames(2 * steps + 1, fps=1 / pause):
+        level = j if j < steps else 2 * steps - j
+        frame.fill(scale_color(color, level / steps))
+        frame.show(pixels)
 
 # Color Chase
 def color_chase(color, wait):
-    for i in range(num_pixels):
-        pixels[i] = color
-        pixels.show()
-        time.sleep(wait)
+    color_wipe(color, wait)
     time.sleep(0.5)
 
 # Theater Chase
 def theater_chase(color, wait):
-    for j in range(10):
-        for q in range(3):
-            for i in range(0, num_pixels, 3):
-                if (i + q) < num_pixels:
-                    pixels[i + q] = color
-            pixels.show()
-            time.sleep(wait)
-            for i in range(0, num_pixels, 3):
-                if (i + q) < num_pixels:
-                    pixels[i + q] = (0, 0, 0)
+    for j in clock.frames(30, fps=1 / wait):
+        frame.clear()
+        frame.set_pixels(slice(j % 3, None, 3), color)
+        frame.show(pixels)
 
 # Color Wipe
 def color_wipe(color, wait):
-    for i in range(num_pixels):
-        pixels[i] = color
-        pixels.show()
-        time.sleep(wait)
+    frame.clear()
+    for i in clock.frames(num_pixels, fps=1 / wait):
+        # Everything up to pixel i, so a dropped frame doesn't leave a gap
+        frame.set_pixels(slice(0, i + 1), color)
+        frame.show(pixels)
 
 # Clear All Pixels
 def clear_pixels():
@@ -0,0 +1,127 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from framebuffer import write_frame
+
+
+class MultiStrip:
+    """
+    One logical canvas of LEDs split across several physical strips (data pins, SPI or
+    PWM channels).
+
+    Looks like a single `neopixel.NeoPixel` to the effects: `pixels[i]`, `fill`,
+    `brightness` and `show()` all work on logical indices, which a mapping table turns into
+    (strip, index) pairs. `show()` refreshes every segment concurrently from worker threads,
+    so the whole canvas can take as long as its longest segment instead of the sum of all
+    of them. That needs every segment on its own output peripheral and driver instance
+    (e.g. separate SPI buses), with the driver releasing the GIL while it clocks data
+    out. Segments sharing one peripheral, such as the single PWM/DMA channel behind
+    Blinka's Raspberry Pi `neopixel_write`, are sent one after another.
+
+    Parameters:
+    - strips: The physical strips, in order.
+    - mapping: Optional sequence of (strip_number, index) pairs, one per logical pixel.
+      Defaults to filling the strips one after another.
+    """
+
+    def __init__(self, strips, mapping=None):
+        self.strips = list(strips)
+        if mapping is None:
+            mapping = [(s, i) for s, strip in enumerate(self.strips) for i in range(len(strip))]
+        mapping = np.asarray(mapping, dtype=np.intp).reshape(-1, 2)
+        self.strip_of = mapping[:, 0]
+        self.index_of = mapping[:, 1]
+        self._pairs = [tuple(pair) for pair in mapping.tolist()]
+
+        # Per strip: which logical pixels land on it and where
+        self._segments = []
+        for s in range(len(self.strips)):
+            logical = np.flatnonzero(self.strip_of == s)
+            self._segments.append((logical, self.index_of[logical]))
+
+        self._executor = None
+
+    @classmethod
+    def from_pins(cls, segments, **kwargs):
+        """
+        Creates one strip per (pin, count) pair with `backend.create_strip` and chains them.
+
+        Parameters:
+        - segments: List of (pin name, number of pixels), e.g. [("D21", 1000), ("D18", 1000)].
+        - kwargs: Passed on to `create_strip` for every segment.
+        """
+        from backend import create_strip
+
+        return cls([create_strip(pin, count, **kwargs) for pin, count in segments])
+
+    def __len__(self):
+        return len(self._pairs)
+
+    @property
+    def n(self):
+        return len(self._pairs)
+
+    def _locate(self, index):
+        if index < 0:
+            index += len(self._pairs)
+        return self._pairs[index]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            for i, color in zip(range(*index.indices(len(self))), value):
+                s, j = self._pairs[i]
+                self.strips[s][j] = color
+        else:
+            s, j = self._locate(index)
+            self.strips[s][j] = value
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        s, j = self._locate(index)
+        return self.strips[s][j]
+
+    def fill(self, color):
+        for strip in self.strips:
+            strip.fill(color)
+
+    @property
+    def brightness(self):
+        return self.strips[0].brightness
+
+    @brightness.setter
+    def brightness(self, value):
+        for strip in self.strips:
+            strip.brightness = value
+
+    def write_frame(self, frame):
+        """
+        Splits an (N, bpp) frame in logical order across the strips' byte buffers.
+        """
+        for strip, (logical, local) in zip(self.strips, self._segments):
+            segment = np.zeros((len(strip), frame.shape[1]), dtype=np.uint8)
+            segment[local] = frame[logical]
+            write_frame(strip, segment)
+
+    def show(self):
+        """
+        Refreshes all segments concurrently and waits until every one has been sent.
+        """
+        if len(self.strips) == 1:
+            self.strips[0].show()
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=len(self.strips), thread_name_prefix="multistrip"
+            )
+        for future in [self._executor.submit(strip.show) for strip in self.strips]:
+            future.result()
+
+    def deinit(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        for strip in self.strips:
+            if hasattr(strip, "deinit"):
+                strip.deinit()
@@ -0,0 +1,71 @@
+from functools import lru_cache
+
+import numpy as np
+
+
+def _wheel_table(bpp):
+    """
+    Builds the 256-entry color wheel: red -> green -> blue -> red, with the white channel
+    (if any) left off.
+    """
+    pos = np.arange(256)
+    table = np.zeros((256, bpp), dtype=np.uint8)
+
+    first = pos < 85
+    table[first, 0] = pos[first] * 3
+    table[first, 1] = 255 - pos[first] * 3
+
+    second = (pos >= 85) & (pos < 170)
+    p = pos[second] - 85
+    table[second, 0] = 255 - p * 3
+    table[second, 2] = p * 3
+
+    third = pos >= 170
+    p = pos[third] - 170
+    table[third, 1] = p * 3
+    table[third, 2] = 255 - p * 3
+
+    table.flags.writeable = False
+    return table
+
+
+class WheelPalette:
+    """
+    Precomputed rainbow color wheel.
+
+    The RGB or RGBW variant is chosen once when the palette is built, so lookups never
+    check the pixel order again. `color` returns a single tuple for per-pixel code and
+    `lookup` gathers a whole frame of colors from an array of hues in one operation.
+    """
+
+    def __init__(self, bpp=3):
+        self.bpp = bpp
+        self.table = _wheel_table(bpp)
+        self._colors = tuple(tuple(int(c) for c in row) for row in self.table)
+        self._off = (0,) * bpp
+
+    def color(self, pos):
+        """
+        Returns the wheel color for `pos` in 0-255 as a tuple; out-of-range positions are off.
+        """
+        if 0 <= pos <= 255:
+            return self._colors[pos]
+        return self._off
+
+    __call__ = color
+
+    def lookup(self, hues, out=None):
+        """
+        Returns an (N, bpp) uint8 frame of wheel colors for an array of hues (wrapped to 0-255).
+        """
+        hues = np.asarray(hues) & 255
+        return np.take(self.table, hues, axis=0, out=out)
+
+
+@lru_cache(maxsize=None)
+def wheel_palette(bpp=3):
+    """
+    Returns the shared wheel palette for strips with `bpp` bytes per pixel
+    (3 for RGB/GRB, 4 for RGBW/GRBW).
+    """
+    return WheelPalette(bpp)
@@ -0,0 +1,220 @@
+"""
+Composable frame pipeline.
+
+A source is any iterator of (N, bpp) uint8 frames, such as an effect from animations.py.
+A stage is a function that takes an iterator of frames and returns another one, so
+stages chain lazily: each frame is pulled through the whole pipeline before the next one
+is rendered, and every stage reuses one output buffer instead of allocating per frame.
+
+    run_pipeline(
+        animations.drip(LAYOUT, (0, 0, 255)),
+        limit_brightness(0.4),
+        gamma(),
+        pace(20),
+        output(pixels),
+    )
+"""
+
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+from colormath import DEFAULT_GAMMA, apply_gamma, scale_frame
+from framebuffer import write_frame
+from power import PowerLimiter
+from scheduler import FrameClock
+
+
+def pipeline(source, *stages):
+    """
+    Chains `stages` onto the `source` frames and returns the resulting iterator.
+    """
+    frames = iter(source)
+    for stage in stages:
+        frames = stage(frames)
+    return frames
+
+
+def run_pipeline(source, *stages):
+    """
+    Pulls every frame through the pipeline, e.g. until an `output` stage has shown the
+    whole effect.
+    """
+    deque(pipeline(source, *stages), maxlen=0)
+
+
+def _per_frame(render):
+    """
+    Turns `render(frame, out)` into a stage with one reused output buffer.
+    """
+
+    def stage(frames):
+        out = None
+        for frame in frames:
+            if out is None or out.shape != frame.shape:
+                out = np.empty(frame.shape, dtype=np.uint8)
+            yield render(frame, out)
+
+    return stage
+
+
+def limit_brightness(max_level=0.5):
+    """
+    Scales frames down whose average channel level is above `max_level` (0-1), capping
+    the overall brightness and with it the current drawn by the strip.
+    """
+    limit = max_level * 255
+
+    def render(frame, out):
+        level = frame.mean() if frame.size else 0.0
+        if level <= limit:
+            return frame
+        # Quantized so the cached scale tables are reused from frame to frame
+        return scale_frame(frame, math.floor(limit / level * 256) / 256, out)
+
+    return _per_frame(render)
+
+
+def limit_power(max_amps, brightness=1.0, segments=None, limiter=None):
+    """
+    Dims frames whose estimated current would exceed the power budget (see power.py).
+
+    Parameters:
+    - max_amps: Budget for the whole strip in amps, or None to only limit `segments`.
+    - brightness: Global brightness of the strip the frames are shown on, or the strip.
+    - segments: Optional list of (pixel_count, max_amps) per injection segment.
+    - limiter: An existing PowerLimiter to use instead, e.g. to read its statistics.
+    """
+    limiter = limiter or PowerLimiter(max_amps, brightness, segments)
+    return _per_frame(limiter.limit)
+
+
+def gamma(value=DEFAULT_GAMMA):
+    """
+    Gamma-corrects every frame with one table lookup.
+    """
+    return _per_frame(lambda frame, out: apply_gamma(frame, value, out))
+
+
+def color_order(order):
+    """
+    Reorders the channels of RGB(W) frames to `order`, e.g. "GRB", for outputs that take
+    raw bytes in wire order.
+    """
+    channels = ["RGBW".index(c) for c in order]
+    return _per_frame(lambda frame, out: np.take(frame, channels, axis=1, out=out))
+
+
+def map_layout(layout):
+    """
+    Maps frames drawn in matrix order, (num_rows, num_cols, bpp) images or row-major
+    (num_pixels, bpp) arrays, to strip order using the layout's index map.
+    """
+    indices = layout.index_map.ravel()
+
+    def stage(frames):
+        out = None
+        for frame in frames:
+            bpp = frame.shape[-1]
+            if out is None or out.shape[1] != bpp:
+                out = np.empty((layout.num_pixels, bpp), dtype=np.uint8)
+            out[indices] = frame.reshape(-1, bpp)
+            yield out
+
+    return stage
+
+
+def profile(profiler, phase="render", effect=None):
+    """
+    Records the time the frames took to produce up to this point as `phase` in a
+    FrameProfiler (see profiler.py), excluding phases recorded further upstream. With
+    `profiler` None the stage does nothing.
+
+    Parameters:
+    - profiler: The FrameProfiler, or None.
+    - phase: Name of the phase, e.g. "render" right after the source, "post" after the
+      post-processing stages.
+    - effect: Name to attribute the frames to once the pipeline starts.
+    """
+    if profiler is None:
+        return lambda frames: frames
+
+    def stage(frames):
+        if effect is not None:
+            profiler.begin(effect)
+        return profiler.timed(phase, frames)
+
+    return stage
+
+
+def pace(fps=20, clock=None, profiler=None):
+    """
+    Passes frames on at `fps`. When rendering falls behind, the frames the clock drops
+    are pulled and discarded so the effect keeps its speed. A `profiler` records the time
+    spent waiting for each deadline and counts the dropped frames.
+    """
+    clock = clock or FrameClock(fps)
+
+    def stage(frames):
+        last = -1
+        ticks = clock.frames(fps=fps)
+        if profiler is not None:
+            ticks = profiler.timed("wait", ticks)
+        for frame_number in ticks:
+            dropped = frame_number - last - 1
+            if dropped and profiler is not None:
+                profiler.count_dropped(dropped)
+            for _ in range(dropped):
+                if next(frames, None) is None:
+                    return
+            last = frame_number
+            frame = next(frames, None)
+            if frame is None:
+                return
+            yield frame
+
+    return stage
+
+
+def paced_render(render, fps=20, clock=None, duration=None):
+    """
+    Source that calls a stateless `render(t, out)` (see animations.RENDERERS) at each of
+    the clock's deadlines, reusing one frame buffer. Dropped ticks are skipped without
+    being rendered at all.
+
+    Parameters:
+    - render: Function returning the frame at `t` seconds, rendered into `out` if given.
+    - fps: Frame rate.
+    - clock: FrameClock to pace with, e.g. to read its statistics.
+    - duration: Seconds to play, or None to play forever.
+    """
+    clock = clock or FrameClock(fps)
+    count = None if duration is None else max(1, round(duration * fps))
+    out = None
+    for frame_number in clock.frames(count, fps=fps):
+        out = render(frame_number / fps, out)
+        yield out
+
+
+def output(strip, profiler=None):
+    """
+    Writes every frame to `strip` and shows it, passing the frames on unchanged. A
+    `profiler` records the write and show time and the pixels changed per frame.
+    """
+
+    def stage(frames):
+        for frame in frames:
+            if profiler is None:
+                write_frame(strip, frame)
+                strip.show()
+            else:
+                start = time.perf_counter()
+                write_frame(strip, frame)
+                strip.show()
+                profiler.record("show", time.perf_counter() - start)
+                profiler.shown(frame)
+            yield frame
+
+    return stage
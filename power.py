@@ -0,0 +1,114 @@
+"""
+Power budget: estimate each frame's current draw and dim frames that would exceed it.
+
+A WS2812 LED draws roughly 20 mA per color channel at full duty plus about 1 mA idle,
+so the current of a frame is proportional to the sum of its channel values times the
+strip's global brightness. The estimate is a single reduction over the frame bytes, and
+a frame is only rescaled (through the cached scale tables) when it is over budget.
+
+Long installations are often fed at several power injection points; give each segment's
+pixel count and budget to limit every segment against its own supply.
+"""
+
+import os
+
+import numpy as np
+
+from colormath import scale_frame
+
+BUDGET_ENV = "NEOPIXEL_POWER_BUDGET"  # Supply current in amps available to the strip
+MA_PER_CHANNEL = 20.0  # Current of one channel at 255
+IDLE_MA = 1.0  # Current of one pixel that is off
+
+
+def budget_from_env(default=None):
+    """
+    Returns the power budget in amps from $NEOPIXEL_POWER_BUDGET, or `default`.
+    """
+    value = os.environ.get(BUDGET_ENV)
+    return float(value) if value else default
+
+
+class PowerLimiter:
+    """
+    Scales frames down so their estimated current stays within budget.
+
+    Parameters:
+    - max_amps: Budget for the whole strip, or None when only `segments` are limited.
+    - brightness: Global brightness the strip applies on top of the frame values, or the
+      strip itself to follow changes of its `brightness`.
+    - segments: Optional list of (pixel_count, max_amps), one per injection segment in
+      strip order.
+    - ma_per_channel: Milliamps drawn by one channel at full value.
+    - idle_ma: Milliamps drawn by one pixel that is off.
+    """
+
+    def __init__(self, max_amps, brightness=1.0, segments=None, ma_per_channel=MA_PER_CHANNEL, idle_ma=IDLE_MA):
+        self.max_amps = max_amps
+        self.brightness = brightness
+        self.ma_per_channel = ma_per_channel
+        self.idle_ma = idle_ma
+        self.segments = segments
+        if segments:
+            counts = [count for count, _ in segments]
+            self._bounds = np.concatenate(([0], np.cumsum(counts)))
+            self._budgets = np.array([amps for _, amps in segments], dtype=np.float64)
+        self.frames_limited = 0
+        self.peak_amps = 0.0
+
+    def _draw(self, frame):
+        """
+        Returns (dynamic, idle) current in amps per segment, or for the whole frame.
+        """
+        if self.segments:
+            starts = self._bounds[:-1] * frame.shape[1]
+            sums = np.add.reduceat(frame.reshape(-1), starts, dtype=np.uint64)
+            pixels = np.diff(self._bounds)
+        else:
+            sums = np.array([frame.sum(dtype=np.uint64)])
+            pixels = np.array([len(frame)])
+        brightness = getattr(self.brightness, "brightness", self.brightness)
+        dynamic = sums * (self.ma_per_channel * brightness / 255000.0)
+        return dynamic, pixels * (self.idle_ma / 1000.0)
+
+    def current(self, frame):
+        """
+        Returns the estimated current in amps of a (N, bpp) frame, as an array with one
+        entry per segment (a single entry without segments).
+        """
+        dynamic, idle = self._draw(frame)
+        return dynamic + idle
+
+    def _scales(self, frame):
+        """
+        Scale factor for each segment (or the whole frame), 1.0 where within budget.
+        """
+        dynamic, idle = self._draw(frame)
+        total = dynamic.sum() + idle.sum()
+        self.peak_amps = max(self.peak_amps, total)
+        dynamic = np.maximum(dynamic, 1e-9)
+        scales = np.ones(len(dynamic))
+        if self.max_amps is not None and total > self.max_amps:
+            # Dim everything evenly to meet the overall budget
+            scales[:] = (self.max_amps - idle.sum()) / dynamic.sum()
+        if self.segments:
+            scales = np.minimum(scales, (self._budgets - idle) / dynamic)
+        # Round down to 1/256 steps so the scale tables are reused from frame to frame
+        return np.floor(np.clip(scales, 0.0, 1.0) * 256) / 256
+
+    def limit(self, frame, out=None):
+        """
+        Returns `frame` unchanged when it is within budget, otherwise the dimmed frame
+        (written into `out` when given).
+        """
+        scales = self._scales(frame)
+        if (scales >= 1.0).all():
+            return frame
+        self.frames_limited += 1
+        if len(scales) == 1:
+            return scale_frame(frame, float(scales[0]), out)
+        if out is None:
+            out = np.empty_like(frame)
+        for scale, start, stop in zip(scales.tolist(), self._bounds[:-1], self._bounds[1:]):
+            scale_frame(frame[start:stop], scale, out[start:stop])
+        return out
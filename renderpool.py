@@ -0,0 +1,130 @@
+"""
+Renders effects in worker processes so the output loop only pushes finished frames.
+
+A RenderProcess runs one effect (any frame generator) in a separate process, which
+renders ahead into a bounded ring of frame slots in shared memory. Two semaphores pass
+slots back and forth: the worker blocks once every slot holds an unshown frame
+(back-pressure), and the output side blocks only when the worker has fallen behind.
+Frames are never pickled; the output side reads them in place from the ring.
+
+    factory = functools.partial(animations.tunnel_drip_rainbow, LAYOUT)
+    with RenderProcess(factory, LAYOUT.num_pixels) as worker:
+        run_pipeline(worker.frames(), pace(20), output(pixels))
+
+The factory is called in the worker, so it must be picklable (a module-level function
+or a functools.partial of one).
+"""
+
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+def _render_worker(factory, shm_name, shape, free, ready, produced):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ring = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+    try:
+        for frame in factory():
+            free.acquire()
+            ring[produced.value % shape[0]] = frame
+            produced.value += 1
+            ready.release()
+    finally:
+        # One extra token with no frame behind it tells the output side the effect ended
+        ready.release()
+        del ring
+        shm.close()
+
+
+class RenderProcess:
+    """
+    Runs `factory()` in a worker process and exposes its frames through shared memory.
+
+    Parameters:
+    - factory: Picklable callable returning an iterator of (num_pixels, bpp) frames.
+    - num_pixels: Pixels per frame.
+    - bpp: Bytes per pixel.
+    - slots: Frames the worker may render ahead of the output.
+    - context: multiprocessing start method ("fork", "spawn", ...), or None for the default.
+    """
+
+    def __init__(self, factory, num_pixels, bpp=3, slots=4, context=None):
+        ctx = multiprocessing.get_context(context)
+        shape = (slots, num_pixels, bpp)
+        self.slots = slots
+        self.consumed = 0
+        self.stalls = 0  # Frames the output had to wait for the worker
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, slots * num_pixels * bpp))
+        self._ring = np.ndarray(shape, dtype=np.uint8, buffer=self._shm.buf)
+        self._ring.flags.writeable = False
+        self._free = ctx.Semaphore(slots)
+        self._ready = ctx.Semaphore(0)
+        self._produced = ctx.Value("Q", 0, lock=False)
+        self._process = ctx.Process(
+            target=_render_worker,
+            args=(factory, self._shm.name, shape, self._free, self._ready, self._produced),
+            name="render-worker",
+            daemon=True,
+        )
+        self._process.start()
+
+    def frames(self):
+        """
+        Yields the rendered frames in order as read-only views into the ring. Each view is
+        valid until the next frame is requested, when its slot goes back to the worker.
+        """
+        holding = False
+        try:
+            while True:
+                if holding:
+                    self._free.release()
+                    holding = False
+                if not self._ready.acquire(block=False):
+                    self.stalls += 1
+                    self._wait_ready()
+                if self.consumed >= self._produced.value:
+                    self._process.join()
+                    if self._process.exitcode:
+                        raise RuntimeError(f"render worker failed with code {self._process.exitcode}")
+                    return
+                frame = self._ring[self.consumed % self.slots]
+                self.consumed += 1
+                holding = True
+                yield frame
+        finally:
+            if holding:
+                self._free.release()
+
+    def _wait_ready(self):
+        while not self._ready.acquire(timeout=0.1):
+            if not self._process.is_alive() and not self._ready.acquire(block=False):
+                raise RuntimeError(
+                    f"render worker exited with code {self._process.exitcode} without finishing"
+                )
+
+    def close(self):
+        """
+        Stops the worker and frees the shared memory.
+        """
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process.join()
+        self._ring = None
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.close()
+
+
+def render_in_process(factory, num_pixels, bpp=3, slots=4):
+    """
+    Frame source that renders `factory()` in a worker process and stops the worker when
+    the source is exhausted or closed, e.g. a Compositor layer or an engine effect.
+    """
+    with RenderProcess(factory, num_pixels, bpp, slots) as worker:
+        yield from worker.frames()
@@ -0,0 +1,151 @@
+import math
+import time
+
+
+class FrameClock:
+    """
+    Paces an animation to a target frame rate using monotonic deadlines.
+
+    Frame `k` of a run is due at `start + k / fps`, so render and `show()` time are
+    absorbed into the frame period instead of being added on top of a fixed sleep.
+    When rendering falls more than a frame behind, late frames are dropped and the
+    frame number jumps ahead, keeping the animation at the same speed on any panel size.
+
+    Parameters:
+    - fps: Target frames per second.
+    - drop_frames: Skip late frames instead of playing every frame slower.
+    - paced: False to yield every frame immediately, with no sleeping and no dropped
+      frames (e.g. when baking or benchmarking).
+    """
+
+    def __init__(self, fps=20, drop_frames=True, paced=True):
+        self.fps = fps
+        self.drop_frames = drop_frames
+        self.paced = paced
+        self.reset()
+
+    def reset(self):
+        """
+        Clears the frame statistics.
+        """
+        self.frames_shown = 0
+        self.frames_dropped = 0
+        self.start_time = None
+        self._last_frame_time = None
+        self._interval_count = 0
+        self._interval_mean = 0.0
+        self._interval_m2 = 0.0
+
+    @property
+    def period(self):
+        return 1.0 / self.fps
+
+    def frames(self, count=None, fps=None):
+        """
+        Yields frame numbers 0, 1, 2, ... each at its deadline, skipping late frames.
+
+        Parameters:
+        - count: Number of frames in the animation, or None to run forever.
+        - fps: Optional new target frame rate for this run.
+        """
+        if fps is not None:
+            self.fps = fps
+        self.reset()
+        self.start_time = time.monotonic()
+        frame = 0
+
+        while count is None or frame < count:
+            if self.paced:
+                frame, delay = self._schedule(frame, count)
+                if delay > 0:
+                    time.sleep(delay)
+
+            self._record_frame()
+            yield frame
+            frame += 1
+
+    async def aframes(self, count=None, fps=None):
+        """
+        Async version of `frames()`: waits for each deadline with `asyncio.sleep`, so other
+        tasks on the event loop run while the next frame is not yet due.
+        """
+        # Imported here so scripts that only use `frames()` don't load asyncio at startup
+        import asyncio
+
+        if fps is not None:
+            self.fps = fps
+        self.reset()
+        self.start_time = time.monotonic()
+        frame = 0
+
+        while count is None or frame < count:
+            delay = 0
+            if self.paced:
+                frame, delay = self._schedule(frame, count)
+            # Always yield to the loop once per frame, even when running behind
+            await asyncio.sleep(delay)
+
+            self._record_frame()
+            yield frame
+            frame += 1
+
+    def _schedule(self, frame, count):
+        """
+        Returns the frame to show next and how long to wait for its deadline, jumping
+        ahead when more than a frame late.
+        """
+        period = self.period
+        deadline = self.start_time + frame * period
+        now = time.monotonic()
+        if now < deadline:
+            return frame, deadline - now
+        if self.drop_frames and now - deadline >= period:
+            # More than a frame late: jump to the frame that is due now
+            due = int((now - self.start_time) / period)
+            if count is not None:
+                due = min(due, count - 1)
+            self.frames_dropped += due - frame
+            frame = due
+        return frame, 0
+
+    def _record_frame(self):
+        now = time.monotonic()
+        if self._last_frame_time is not None:
+            # Welford's running mean/variance of frame intervals, constant memory
+            interval = now - self._last_frame_time
+            self._interval_count += 1
+            delta = interval - self._interval_mean
+            self._interval_mean += delta / self._interval_count
+            self._interval_m2 += delta * (interval - self._interval_mean)
+        self._last_frame_time = now
+        self.frames_shown += 1
+
+    def stats(self):
+        """
+        Returns a dict with the target and achieved FPS, mean frame time, frame-time jitter
+        (standard deviation) in milliseconds, and shown/dropped frame counts.
+        """
+        elapsed = 0.0
+        if self.start_time is not None and self._last_frame_time is not None:
+            elapsed = self._last_frame_time - self.start_time
+        intervals = self._interval_count
+        jitter = math.sqrt(self._interval_m2 / intervals) if intervals else 0.0
+        return {
+            "target_fps": self.fps,
+            "achieved_fps": intervals / elapsed if elapsed > 0 else 0.0,
+            "frame_time_ms": self._interval_mean * 1000,
+            "jitter_ms": jitter * 1000,
+            "frames_shown": self.frames_shown,
+            "frames_dropped": self.frames_dropped,
+        }
+
+    def summary(self):
+        """
+        One-line human readable version of `stats()`.
+        """
+        s = self.stats()
+        return (
+            f"{s['achieved_fps']:.1f}/{s['target_fps']:g} fps, "
+            f"{s['frame_time_ms']:.2f} ms/frame, jitter {s['jitter_ms']:.2f} ms, "
+            f"{s['frames_shown']} shown, {s['frames_dropped']} dropped"
+        )
@@ -0,0 +1,279 @@
+"""
+Keyframe + sparse-delta encoding for recorded LED sequences.
+
+Most frames of these effects differ from the previous one in only a few pixels, so a
+sequence stores a full keyframe every `keyframe_interval` frames and, in between, only
+the runs of pixels that changed: (start index, run length) pairs followed by the new
+colors. An index of frame offsets at the end of the file makes seeking to any frame a
+jump to the nearest keyframe plus at most `keyframe_interval - 1` delta applications,
+each of which is a single fancy-indexed write into the frame buffer.
+
+Layout of a .npxs file:
+
+    header      HEADER (frame_count and index_offset are filled in on close)
+    frames      keyframe: b"K" + num_pixels * bpp color bytes
+                delta:    b"D" + uint32 run count R + uint32[R] starts
+                          + uint16[R] lengths + sum(lengths) * bpp color bytes
+    index       uint64[frame_count] file offset of each frame record
+"""
+
+import mmap
+import struct
+
+import numpy as np
+
+from bake import RecordingStrip, run_offline
+from framebuffer import write_frame
+from scheduler import FrameClock
+
+MAGIC = b"NPXS"
+VERSION = 1
+KEYFRAME = b"K"
+DELTA = b"D"
+# magic, version, bpp, num_pixels, frame_count, fps, keyframe_interval, index_offset
+HEADER = struct.Struct("<4sBxHIIfIQ")
+RUN_COUNT = struct.Struct("<I")
+MAX_RUN = 0xFFFF
+
+
+def changed_runs(previous, frame):
+    """
+    Returns (starts, lengths) of the runs of pixels that differ between two (N, bpp) frames.
+    Runs are split so no run is longer than MAX_RUN pixels.
+    """
+    changed = (previous != frame).any(axis=1).astype(np.int8)
+    edges = np.diff(np.concatenate(([0], changed, [0])))
+    starts = np.flatnonzero(edges == 1)
+    lengths = np.flatnonzero(edges == -1) - starts
+    if len(lengths) and lengths.max() > MAX_RUN:
+        pieces = [
+            (start + offset, min(MAX_RUN, length - offset))
+            for start, length in zip(starts.tolist(), lengths.tolist())
+            for offset in range(0, length, MAX_RUN)
+        ]
+        starts, lengths = (np.array(column, dtype=np.intp) for column in zip(*pieces))
+    return starts, lengths
+
+
+def run_indices(starts, lengths):
+    """
+    Expands runs into the flat array of pixel indices they cover.
+    """
+    total = int(lengths.sum())
+    if not total:
+        return np.empty(0, dtype=np.intp)
+    # Offset of each run's first pixel within the flat output, repeated over the run
+    run_offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+    return run_offsets + np.arange(total)
+
+
+class SequenceWriter:
+    """
+    Encodes frames from any source into a keyframe + delta sequence file.
+
+    Parameters:
+    - path: File to write.
+    - num_pixels: Pixels per frame.
+    - bpp: Bytes per pixel.
+    - fps: Playback frame rate stored in the file.
+    - keyframe_interval: A full frame is stored at least this often, bounding seek cost.
+    """
+
+    def __init__(self, path, num_pixels, bpp=3, fps=20, keyframe_interval=60):
+        self.num_pixels = num_pixels
+        self.bpp = bpp
+        self.fps = fps
+        self.keyframe_interval = keyframe_interval
+        self.offsets = []
+        self._previous = None
+        self._since_keyframe = 0
+        self._file = open(path, "wb")
+        self._file.write(self._header())
+
+    def _header(self, index_offset=0):
+        return HEADER.pack(
+            MAGIC,
+            VERSION,
+            self.bpp,
+            self.num_pixels,
+            len(self.offsets),
+            self.fps,
+            self.keyframe_interval,
+            index_offset,
+        )
+
+    def add(self, frame):
+        """
+        Appends one (num_pixels, bpp) uint8 frame.
+        """
+        frame = np.asarray(frame, dtype=np.uint8).reshape(self.num_pixels, self.bpp)
+        self.offsets.append(self._file.tell())
+
+        record = None
+        if self._previous is not None and self._since_keyframe < self.keyframe_interval:
+            starts, lengths = changed_runs(self._previous, frame)
+            colors = frame[run_indices(starts, lengths)]
+            # Fall back to a keyframe when the delta wouldn't be smaller
+            if RUN_COUNT.size + len(starts) * 6 + colors.nbytes < frame.nbytes:
+                record = b"".join(
+                    (
+                        DELTA,
+                        RUN_COUNT.pack(len(starts)),
+                        starts.astype("<u4").tobytes(),
+                        lengths.astype("<u2").tobytes(),
+                        colors.tobytes(),
+                    )
+                )
+                self._since_keyframe += 1
+
+        if record is None:
+            record = KEYFRAME + frame.tobytes()
+            self._since_keyframe = 1
+
+        self._file.write(record)
+        self._previous = frame.copy()
+
+    def close(self):
+        index_offset = self._file.tell()
+        self._file.write(np.array(self.offsets, dtype="<u8").tobytes())
+        self._file.seek(0)
+        self._file.write(self._header(index_offset))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.close()
+
+
+class SequenceReader:
+    """
+    Decodes a sequence file by applying frames in place to a caller-owned frame array.
+
+    The file is memory-mapped; `decode_into` steps forward with deltas when the requested
+    frame follows the last one decoded and otherwise seeks from the nearest keyframe.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            magic,
+            version,
+            self.bpp,
+            self.num_pixels,
+            self.frame_count,
+            self.fps,
+            self.keyframe_interval,
+            index_offset,
+        ) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} sequence file")
+        self.offsets = np.frombuffer(
+            self._mmap, dtype="<u8", count=self.frame_count, offset=index_offset
+        ).astype(np.intp)
+        kinds = bytes(self._mmap[offset] for offset in self.offsets.tolist())
+        self._keyframes = np.array(
+            [i for i, kind in enumerate(kinds) if kind == KEYFRAME[0]], dtype=np.intp
+        )
+        self._position = None
+
+    def __len__(self):
+        return self.frame_count
+
+    def new_frame(self):
+        return np.zeros((self.num_pixels, self.bpp), dtype=np.uint8)
+
+    def _apply(self, index, out):
+        offset = int(self.offsets[index])
+        kind = self._mmap[offset:offset + 1]
+        offset += 1
+        if kind == KEYFRAME:
+            out[:] = np.frombuffer(
+                self._mmap, dtype=np.uint8, count=out.size, offset=offset
+            ).reshape(out.shape)
+            return
+        (run_count,) = RUN_COUNT.unpack_from(self._mmap, offset)
+        offset += RUN_COUNT.size
+        starts = np.frombuffer(self._mmap, dtype="<u4", count=run_count, offset=offset)
+        offset += run_count * 4
+        lengths = np.frombuffer(self._mmap, dtype="<u2", count=run_count, offset=offset)
+        offset += run_count * 2
+        indices = run_indices(starts.astype(np.intp), lengths.astype(np.intp))
+        out[indices] = np.frombuffer(
+            self._mmap, dtype=np.uint8, count=len(indices) * self.bpp, offset=offset
+        ).reshape(-1, self.bpp)
+
+    def decode_into(self, index, out):
+        """
+        Makes `out` (a (num_pixels, bpp) array, e.g. `FrameBuffer.pixels`) hold frame `index`.
+        Pass the same array every time so sequential playback only applies deltas.
+        """
+        keyframe = int(self._keyframes[np.searchsorted(self._keyframes, index, "right") - 1])
+        if self._position is not None and keyframe <= self._position < index:
+            # `out` already holds an earlier frame past the keyframe: only apply deltas
+            start = self._position + 1
+        else:
+            start = keyframe
+        for position in range(start, index + 1):
+            self._apply(position, out)
+        self._position = index
+        return out
+
+    def frames(self):
+        """
+        Yields every frame in order, decoded into one reused array.
+        """
+        out = self.new_frame()
+        self._position = None
+        for index in range(self.frame_count):
+            yield self.decode_into(index, out)
+
+    def play(self, strip, loop=False, clock=None):
+        """
+        Streams the sequence into `strip` at its frame rate, dropping frames when behind.
+        """
+        clock = clock or FrameClock(self.fps)
+        out = self.new_frame()
+        self._position = None
+        while True:
+            for index in clock.frames(self.frame_count, fps=self.fps):
+                write_frame(strip, self.decode_into(index, out))
+                strip.show()
+            if not loop:
+                break
+
+    def close(self):
+        self.offsets = None
+        self._mmap.close()
+
+
+class EncodingStrip(RecordingStrip):
+    """
+    Recording strip that streams every shown frame into a SequenceWriter instead of
+    keeping it in memory.
+    """
+
+    def __init__(self, writer, max_frames=None):
+        super().__init__(writer.num_pixels, writer.bpp, max_frames, record=False)
+        self.writer = writer
+        self._view = np.frombuffer(self.buf, dtype=np.uint8).reshape(
+            writer.num_pixels, writer.bpp
+        )
+
+    def show(self):
+        self.writer.add(self._view)
+        super().show()
+
+
+def record_sequence(
+    path, render, num_pixels, bpp=3, fps=20, max_frames=None, keyframe_interval=60, seed=0
+):
+    """
+    Runs `render(strip)` offline and encodes every frame it shows into `path`.
+    Returns the number of frames recorded.
+    """
+    with SequenceWriter(path, num_pixels, bpp, fps, keyframe_interval) as writer:
+        run_offline(render, EncodingStrip(writer, max_frames), seed)
+        return len(writer.offsets)
@@ -0,0 +1,192 @@
+import time
+from collections import deque
+
+# WS2812 timing: every bit takes 1.25 us on the wire, and the strip latches the frame
+# after the data line has been held low for the reset period.
+BIT_TIME = 1.25e-6
+RESET_LATCH = 280e-6
+
+
+def wire_time(num_pixels, bpp=3):
+    """
+    Seconds needed to clock one frame out to a WS2812 strip, including the reset latch.
+    """
+    return num_pixels * bpp * 8 * BIT_TIME + RESET_LATCH
+
+
+class SimulatedNeoPixel:
+    """
+    Hardware-free stand-in for `neopixel.NeoPixel`.
+
+    Exposes the same `__setitem__`/`__getitem__`/`fill`/`show`/`brightness`/`pixel_order`
+    surface and the same internal byte buffers, so effects and `framebuffer.write_frame`
+    run unchanged. Every `show()` is counted, its WS2812 wire time is accumulated, and the
+    sent frame can be kept in memory or appended to a file as raw wire-order bytes.
+
+    Parameters:
+    - pin: Ignored, kept for signature compatibility.
+    - n: Number of pixels.
+    - brightness: Global brightness between 0 and 1.
+    - auto_write: Call `show()` after every change, like the real driver.
+    - bpp: Bytes per pixel, used to pick GRB or GRBW when `pixel_order` is not given.
+    - pixel_order: Byte order string such as "GRB" or "GRBW".
+    - record: Keep sent frames in `frames` (True, or an int to keep only the last N).
+    - record_file: Path or binary file object that every sent frame is appended to.
+    - realtime: Sleep for the modeled wire time in `show()`, like a blocking bit-bang write.
+    """
+
+    def __init__(
+        self,
+        pin,
+        n,
+        *,
+        bpp=None,
+        brightness=1.0,
+        auto_write=True,
+        pixel_order=None,
+        record=False,
+        record_file=None,
+        realtime=False,
+    ):
+        self.pin = pin
+        self._pixels = n
+        if pixel_order is None:
+            pixel_order = "GRBW" if bpp == 4 else "GRB"
+        self._byteorder_string = pixel_order
+        self._byteorder = tuple(pixel_order.index(c) for c in "RGBW"[: len(pixel_order)])
+        self._bpp = len(pixel_order)
+        self._offset = 0
+        self._bytes = n * self._bpp
+        self._pre_brightness_buffer = bytearray(self._bytes)
+        self._post_brightness_buffer = bytearray(self._bytes)
+        self._brightness = min(max(brightness, 0.0), 1.0)
+        self.realtime = realtime
+
+        if record is True:
+            self.frames = []
+        elif record:
+            self.frames = deque(maxlen=record)
+        else:
+            self.frames = None
+        self._owns_file = isinstance(record_file, str)
+        self.record_file = open(record_file, "wb") if self._owns_file else record_file
+
+        self.show_count = 0
+        self.wire_time = 0.0
+        self.frame_wire_time = wire_time(n, self._bpp)
+        self.auto_write = auto_write
+
+    @property
+    def n(self):
+        return self._pixels
+
+    def __len__(self):
+        return self._pixels
+
+    @property
+    def bpp(self):
+        return self._bpp
+
+    @property
+    def byteorder(self):
+        return self._byteorder_string
+
+    pixel_order = byteorder
+
+    @property
+    def buf(self):
+        return self._post_brightness_buffer
+
+    @property
+    def brightness(self):
+        return self._brightness
+
+    @brightness.setter
+    def brightness(self, value):
+        self._brightness = min(max(value, 0.0), 1.0)
+        pre = self._pre_brightness_buffer
+        self._post_brightness_buffer[:] = bytes(int(v * self._brightness) for v in pre)
+        if self.auto_write:
+            self.show()
+
+    def _parse_color(self, value):
+        if isinstance(value, int):
+            w = value >> 24 & 0xFF
+            color = (value >> 16 & 0xFF, value >> 8 & 0xFF, value & 0xFF)
+            return color + (w,) if self._bpp == 4 else color
+        color = tuple(value)
+        if self._bpp == 4 and len(color) == 3:
+            return color + (0,)
+        return color[: self._bpp]
+
+    def _set_item(self, index, color):
+        offset = self._offset + index * self._bpp
+        for channel, value in enumerate(color):
+            position = offset + self._byteorder[channel]
+            self._pre_brightness_buffer[position] = value
+            self._post_brightness_buffer[position] = int(value * self._brightness)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            for i, color in zip(range(*index.indices(self._pixels)), value):
+                self._set_item(i, self._parse_color(color))
+        else:
+            if index < 0:
+                index += self._pixels
+            if not 0 <= index < self._pixels:
+                raise IndexError("pixel index out of range")
+            self._set_item(index, self._parse_color(value))
+        if self.auto_write:
+            self.show()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._pixels))]
+        if index < 0:
+            index += self._pixels
+        offset = self._offset + index * self._bpp
+        buf = self._pre_brightness_buffer
+        return tuple(buf[offset + self._byteorder[channel]] for channel in range(self._bpp))
+
+    def fill(self, color):
+        color = self._parse_color(color)
+        raw = bytearray(self._bpp)
+        for channel, value in enumerate(color):
+            raw[self._byteorder[channel]] = value
+        self._pre_brightness_buffer[:] = bytes(raw) * self._pixels
+        scaled = bytes(int(v * self._brightness) for v in raw)
+        self._post_brightness_buffer[:] = scaled * self._pixels
+        if self.auto_write:
+            self.show()
+
+    def show(self):
+        """
+        "Sends" the current frame: counts it, adds its wire time and records it.
+        """
+        self.show_count += 1
+        self.wire_time += self.frame_wire_time
+        if self.frames is not None:
+            self.frames.append(bytes(self._post_brightness_buffer))
+        if self.record_file is not None:
+            self.record_file.write(self._post_brightness_buffer)
+        if self.realtime:
+            time.sleep(self.frame_wire_time)
+
+    write = show
+
+    def max_fps(self):
+        """
+        Highest frame rate the modeled wire allows for this strip length.
+        """
+        return 1.0 / self.frame_wire_time
+
+    def deinit(self):
+        if self._owns_file:
+            self.record_file.close()
+            self.record_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.deinit()
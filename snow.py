@@ -0,0 +1,142 @@
+"""
+Particle snowfall that fills the matrix from the bottom up.
+
+Many flakes fall at once. Each flake picks its column when it spawns and reserves the
+cell it will land on, so the work per tick is proportional to the number of falling
+flakes: they are moved, erased and redrawn with a few array operations, and a landing
+only writes the one cell that became snow. Column heights are kept in buckets by height
+so the shortest columns, and a random column at most `spread` above them, are found
+without scanning every column.
+"""
+
+import random
+
+import numpy as np
+
+from framebuffer import FrameBuffer
+
+FLAKE_COLOR = (255, 255, 255)
+GROUND_COLOR = (10, 10, 10)
+
+
+class ColumnHeights:
+    """
+    Column heights bucketed by height, with constant time updates and balanced picks.
+
+    Parameters:
+    - num_cols: Number of columns.
+    - max_height: Height of a full column.
+    """
+
+    def __init__(self, num_cols, max_height):
+        self.max_height = max_height
+        self.heights = [0] * num_cols
+        self.min_height = 0 if num_cols else max_height
+        self._buckets = [list(range(num_cols))] + [[] for _ in range(max_height)]
+        self._slot = list(range(num_cols))  # Position of each column in its bucket
+
+    def raise_column(self, col):
+        """
+        Adds one cell to a column and returns its new height.
+        """
+        height = self.heights[col]
+        bucket = self._buckets[height]
+        last = bucket.pop()
+        if last != col:
+            # Swap-remove: move the last column of the bucket into this column's place
+            bucket[self._slot[col]] = last
+            self._slot[last] = self._slot[col]
+        height += 1
+        self.heights[col] = height
+        self._slot[col] = len(self._buckets[height])
+        self._buckets[height].append(col)
+        while self.min_height < self.max_height and not self._buckets[self.min_height]:
+            self.min_height += 1
+        return height
+
+    @property
+    def full(self):
+        return self.min_height >= self.max_height
+
+    def choose(self, spread=2):
+        """
+        Returns a random column that isn't full and is at most `spread` cells taller than
+        the shortest column, or None when every column is full.
+        """
+        top = min(self.min_height + spread, self.max_height - 1)
+        buckets = self._buckets[self.min_height:top + 1]
+        total = sum(map(len, buckets))
+        if not total:
+            return None
+        pick = random.randrange(total)
+        for bucket in buckets:
+            if pick < len(bucket):
+                return bucket[pick]
+            pick -= len(bucket)
+
+
+def snowing(layout, fall_wait=0.2, flakes_per_second=None, spread=2, fps=20):
+    """
+    Lights fall from the top, stack at the bottom and fill the matrix, keeping columns
+    within `spread` of the shortest one. Stacked snow gets brighter the higher it lies.
+
+    Parameters:
+    - layout: The matrix layout.
+    - fall_wait: Seconds a flake takes to fall one row.
+    - flakes_per_second: New flakes per second, default one per 5 columns.
+    - spread: How much taller than the shortest column a column may grow.
+    - fps: Frames per second the generator is played at.
+    """
+    frame = FrameBuffer.for_layout(layout)
+    num_rows, num_cols = layout.num_rows, layout.num_cols
+    index_map = layout.index_map
+    heights = ColumnHeights(num_cols, num_rows)
+    rows_per_tick = 1.0 / (fall_wait * fps)
+    spawn_per_tick = (flakes_per_second or max(1.0, num_cols / 5)) / fps
+    snow_levels = np.minimum(255, 50 + np.arange(num_rows + 1) * 20).astype(np.uint8)
+
+    # Falling flakes: the tick each one spawned at, its column, its row and the row it
+    # lands on. Rows follow from the spawn tick, so flakes in one column keep their order.
+    spawned = np.empty(0, dtype=np.intp)
+    cols = np.empty(0, dtype=np.intp)
+    rows = np.empty(0, dtype=np.intp)
+    targets = np.empty(0, dtype=np.intp)
+    last_spawn = [-num_rows * fps] * num_cols
+    spawn_credit = 0.0
+    tick = 0
+
+    frame.pixels[index_map[num_rows - 1]] = GROUND_COLOR
+    yield frame.pixels
+
+    while not heights.full or len(cols):
+        tick += 1
+        spawn_credit = min(spawn_credit + spawn_per_tick, spawn_per_tick + 1.0)
+        new_cols = []
+        new_targets = []
+        while spawn_credit >= 1.0:
+            col = heights.choose(spread)
+            if col is None or (tick - last_spawn[col]) * rows_per_tick < 1.0:
+                # Full, or the column's last flake hasn't left the top row yet
+                break
+            spawn_credit -= 1.0
+            last_spawn[col] = tick
+            new_cols.append(col)
+            new_targets.append(num_rows - heights.raise_column(col))
+
+        # Erase the flakes where they were, move them, then draw them where they are now
+        frame.pixels[index_map[rows, cols]] = 0
+        spawned = np.concatenate((spawned, np.full(len(new_cols), tick, dtype=np.intp)))
+        cols = np.concatenate((cols, np.array(new_cols, dtype=np.intp)))
+        targets = np.concatenate((targets, np.array(new_targets, dtype=np.intp)))
+        rows = np.minimum(((tick - spawned) * rows_per_tick).astype(np.intp), targets)
+        frame.pixels[index_map[rows, cols]] = FLAKE_COLOR
+
+        landed = rows == targets
+        if landed.any():
+            # Only the landing cell changes: it turns into snow lit by its height
+            land_rows = targets[landed]
+            levels = snow_levels[num_rows - land_rows]
+            frame.pixels[index_map[land_rows, cols[landed]]] = levels[:, None]
+            falling = ~landed
+            spawned, cols, rows, targets = spawned[falling], cols[falling], rows[falling], targets[falling]
+        yield frame.pixels
@@ -0,0 +1,217 @@
+"""
+Synchronized playback of one show on several controllers.
+
+One controller leads: it keeps the show clock and answers sync requests over UDP. Every
+other controller follows: it asks the leader for the time a few times a second, keeps
+the offset measured on the fastest round trip (half the round trip is the most the
+estimate can be off by), and reads the show time from its own monotonic clock plus that
+offset. No pixel data crosses the network. Each controller renders its own panel with a
+stateless `render(t)` (animations.RENDERERS) at the same show timestamps, showing frame k
+when the show clock reaches k / fps, so the panels stay within a frame of each other for
+as long as they run.
+
+    python -m effects lead effect=tunnel_drip_rainbow        # on one Pi
+    python -m effects follow leader=192.168.1.10             # on the others
+
+The leader also tells the followers which effect to play and with which parameters.
+"""
+
+import json
+import socket
+import struct
+import threading
+import time
+
+import animations
+from effects import DEFAULT_COLOR, get_effect
+from framebuffer import write_frame
+
+SYNC_PORT = 7891
+MAGIC = b"NPXC"
+REQUEST = struct.Struct("<4sd")  # Magic, follower's send time
+REPLY = struct.Struct("<4sdd")  # Magic, echoed send time, leader's show time; then the program as JSON
+SAMPLES = 8  # Recent round trips the offset is chosen from
+MAX_PACKET = 1500
+
+
+def renderer(layout, program):
+    """
+    Returns `render(t)` for a program {"effect": name, "params": {...}} played on `layout`.
+    """
+    name = program["effect"]
+    if name not in animations.RENDERERS:
+        raise ValueError(f"{name} can't be synchronized, expected one of {', '.join(animations.RENDERERS)}")
+    # JSON turns color tuples into lists
+    params = {key: tuple(value) if isinstance(value, list) else value for key, value in program["params"].items()}
+    color = params.pop("color", DEFAULT_COLOR)
+    args = (layout, color) if get_effect(name).color else (layout,)
+    return animations.RENDERERS[name](*args, **params)
+
+
+def play(render, strip, fps, show_time, stop=None):
+    """
+    Shows frame k of `render` when `show_time()` reaches k / fps, until `stop` is set.
+    Frames whose time has passed are skipped, never rendered late.
+
+    Parameters:
+    - render: Function returning the frame at `t` seconds, rendered into `out` if given.
+    - strip: The strip to show the frames on.
+    - fps: Frame rate.
+    - show_time: Function returning the current show time in seconds.
+    - stop: Optional threading.Event ending the playback.
+    """
+    frame = None
+    while stop is None or not stop.is_set():
+        frame_number = int(show_time() * fps) + 1
+        frame = render(frame_number / fps, frame)
+        # Render ahead, then show on the frame's boundary
+        delay = frame_number / fps - show_time()
+        if delay > 0:
+            time.sleep(delay)
+        write_frame(strip, frame)
+        strip.show()
+
+
+class SyncLeader:
+    """
+    Keeps the show clock and answers followers' sync requests from a background thread.
+
+    Parameters:
+    - program: {"effect": name, "params": {...}} sent to the followers.
+    - port: UDP port to answer on.
+    - host: Address to bind to.
+    """
+
+    def __init__(self, program, port=SYNC_PORT, host="0.0.0.0"):
+        self.program = program
+        self.start_time = time.monotonic()
+        self.requests = 0
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.port = self.sock.getsockname()[1]
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def show_time(self):
+        return time.monotonic() - self.start_time
+
+    def _serve(self):
+        while True:
+            try:
+                data, address = self.sock.recvfrom(MAX_PACKET)
+            except OSError:
+                # Socket closed
+                return
+            if len(data) != REQUEST.size:
+                continue
+            magic, sent = REQUEST.unpack(data)
+            if magic != MAGIC:
+                continue
+            reply = REPLY.pack(MAGIC, sent, self.show_time()) + json.dumps(self.program).encode()
+            self.sock.sendto(reply, address)
+            self.requests += 1
+
+    def close(self):
+        self.sock.close()
+
+
+class SyncFollower:
+    """
+    Tracks the leader's show clock, re-measuring the offset from a background thread.
+
+    Parameters:
+    - leader: Host name or address of the leader.
+    - port: The leader's sync port.
+    - interval: Seconds between sync requests.
+    - timeout: Seconds to wait for a reply.
+    """
+
+    def __init__(self, leader, port=SYNC_PORT, interval=0.5, timeout=0.5):
+        self.interval = interval
+        self.offset = None
+        self.round_trip = None
+        self.program = None
+        self.replies = 0
+        self._samples = []
+        self._synced = threading.Event()
+        self._closed = threading.Event()
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect((leader, port))
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def sync(self):
+        """
+        Measures the offset to the leader once. Returns False when no reply came.
+        """
+        sent = time.monotonic()
+        try:
+            self.sock.send(REQUEST.pack(MAGIC, sent))
+            while True:
+                data = self.sock.recv(MAX_PACKET)
+                received = time.monotonic()
+                magic, echoed, leader_time = REPLY.unpack_from(data)
+                # Ignore late replies to earlier requests
+                if magic == MAGIC and echoed == sent:
+                    break
+        except (OSError, struct.error):
+            return False
+
+        round_trip = received - sent
+        # The leader read its clock somewhere within the round trip; assume halfway
+        self._samples = self._samples[-(SAMPLES - 1):] + [(round_trip, leader_time - (sent + received) / 2)]
+        self.round_trip, self.offset = min(self._samples)
+        self.program = json.loads(data[REPLY.size:])
+        self.replies += 1
+        self._synced.set()
+        return True
+
+    def _run(self):
+        while not self._closed.is_set():
+            self.sync()
+            self._closed.wait(self.interval if self._synced.is_set() else 0.1)
+
+    def wait_synced(self, timeout=None):
+        """
+        Waits for the first reply from the leader; returns False on timeout.
+        """
+        return self._synced.wait(timeout)
+
+    def show_time(self):
+        return time.monotonic() + self.offset
+
+    def close(self):
+        self._closed.set()
+        self._thread.join()
+        self.sock.close()
+
+
+def lead(layout, strip, fps, effect="tunnel_drip_rainbow", port=SYNC_PORT, **params):
+    """
+    Plays `effect` as the leader, answering followers on `port` (effects registry driver).
+    """
+    program = {"effect": effect, "params": params}
+    render = renderer(layout, program)
+    leader = SyncLeader(program, port)
+    print(f"Leading {effect} on UDP port {leader.port}")
+    try:
+        play(render, strip, fps, leader.show_time)
+    finally:
+        leader.close()
+
+
+def follow(layout, strip, fps, leader="127.0.0.1", port=SYNC_PORT, interval=0.5):
+    """
+    Plays whatever the leader plays, in step with it (effects registry driver).
+    """
+    follower = SyncFollower(leader, port, interval)
+    print(f"Waiting for the leader at {leader}:{port}...")
+    while not follower.wait_synced(1.0):
+        pass
+    print(f"Following {follower.program['effect']}, round trip {follower.round_trip * 1000:.2f} ms")
+    try:
+        play(renderer(layout, follower.program), strip, fps, follower.show_time)
+    finally:
+        follower.close()
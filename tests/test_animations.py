@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+import animations
+from layout import Layout
+
+LAYOUT = Layout(6, 8)
+COLOR = (0, 128, 255)
+
+
+def renderers():
+    params = []
+    for name, factory in animations.RENDERERS.items():
+        color = (COLOR,) if name in ("drip", "wave", "tunnel_drip") else ()
+        params.append(pytest.param(factory(LAYOUT, *color), id=name))
+    return params
+
+
+@pytest.mark.parametrize("render", renderers())
+def test_render_returns_independent_frames(render):
+    times = (0.0, 0.25, 0.5, 1.3)
+    frames = [render(t) for t in times]
+    for t, frame in zip(times, frames):
+        assert np.array_equal(frame, render(t))
+    assert len({id(frame) for frame in frames}) == len(frames)
+
+
+@pytest.mark.parametrize("render", renderers())
+def test_render_into_out_matches_fresh_frame(render):
+    out = np.empty((LAYOUT.num_pixels, 3), dtype=np.uint8)
+    for t in (1.3, 0.0, 0.7):
+        assert render(t, out) is out
+        assert np.array_equal(out, render(t))
@@ -0,0 +1,44 @@
+import numpy as np
+
+import animations
+from bake import BakeCache
+from framebuffer import write_frame
+from layout import Layout
+
+
+def rainbow(layout):
+    def render(strip):
+        for frame in animations.rainbow_cycle(layout):
+            write_frame(strip, frame)
+            strip.show()
+
+    return render
+
+
+def test_cache_keeps_different_fps_apart(tmp_path):
+    cache = BakeCache(str(tmp_path))
+    layout = Layout(4, 4)
+    slow = cache.get("rainbow_cycle", {}, layout, rainbow(layout), fps=20)
+    fast = cache.get("rainbow_cycle", {}, layout, rainbow(layout), fps=60)
+    assert slow.path != fast.path
+    assert (slow.fps, fast.fps) == (20, 60)
+    assert len(list(tmp_path.glob("*.npxb"))) == 2
+
+
+def test_cache_keeps_different_frame_limits_apart(tmp_path):
+    cache = BakeCache(str(tmp_path))
+    layout = Layout(4, 4)
+    full = cache.get("rainbow_cycle", {}, layout, rainbow(layout))
+    short = cache.get("rainbow_cycle", {}, layout, rainbow(layout), max_frames=10)
+    assert len(short) == 10
+    assert len(full) > 10
+    assert len(list(tmp_path.glob("*.npxb"))) == 2
+
+
+def test_cache_reuses_identical_bakes(tmp_path):
+    cache = BakeCache(str(tmp_path))
+    layout = Layout(4, 4)
+    first = cache.get("rainbow_cycle", {}, layout, rainbow(layout), fps=20, max_frames=10)
+    second = cache.get("rainbow_cycle", {}, layout, rainbow(layout), max_frames=10, fps=20)
+    assert first is second
+    assert np.array_equal(first.frame(3), second.frame(3))
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from backend import LazyStrip
+from framebuffer import ChangeTrackingStrip, write_frame
+from simstrip import SimulatedNeoPixel
+
+
+class PixelWriteStrip(SimulatedNeoPixel):
+    """
+    Simulated strip that fails on per-pixel writes, to check bulk writes bypass them.
+    """
+
+    def __setitem__(self, index, value):
+        raise AssertionError("write_frame fell back to per-pixel writes")
+
+
+def test_write_frame_stays_bulk_through_lazy_strip():
+    # The wrappers the effect scripts use: LazyStrip around ChangeTrackingStrip
+    lazy = LazyStrip(None, 4)
+    lazy._strip = ChangeTrackingStrip(PixelWriteStrip(None, 4, auto_write=False))
+    frame = np.arange(12, dtype=np.uint8).reshape(4, 3)
+    write_frame(lazy, frame)
+    assert lazy[3] == tuple(frame[3])
+
+
+def test_for_layout_reuses_the_layout_index_map():
+    from framebuffer import FrameBuffer
+    from layout import Layout
+
+    layout = Layout(3, 5)
+    frame = FrameBuffer.for_layout(layout, bpp=4)
+    assert (frame.num_rows, frame.num_cols, frame.num_pixels) == (3, 5, 15)
+    assert frame.index_map is layout.index_map
+    assert frame.pixels.shape == (15, 4)
+
+
+def test_write_frame_rgb_on_rgbw_strip_matches_setitem():
+    strip = SimulatedNeoPixel(None, 3, brightness=0.5, auto_write=False, pixel_order="GRBW")
+    expected = SimulatedNeoPixel(None, 3, brightness=0.5, auto_write=False, pixel_order="GRBW")
+    frame = np.array([[10, 20, 30], [255, 0, 128], [1, 2, 3]], dtype=np.uint8)
+    write_frame(strip, frame)
+    for i, color in enumerate(frame.tolist()):
+        expected[i] = tuple(color)
+    assert bytes(strip._post_brightness_buffer) == bytes(expected._post_brightness_buffer)
+    assert strip[1] == (255, 0, 128, 0)
+
+
+def test_write_frame_rejects_frames_without_rgb():
+    strip = SimulatedNeoPixel(None, 2, auto_write=False)
+    with pytest.raises(ValueError):
+        write_frame(strip, np.zeros((2, 1), dtype=np.uint8))
@@ -1,3 +1,18 @@
+from itertools import chain
+import numpy as np
+from framebuffer import FrameBuffer
+from colormath import apply_brightness
+from pipeline import run_pipeline, pace, output
+from backend import LazyStrip, GRB
+
+# Strip setup, created on first use
+pixel_pin = "D21"
+num_pixels = 50
+ORDER = GRB
+pixels = LazyStrip(
+    pixel_pin, num_pixels, brightness=0.2, auto_write=False, pixel_order=ORDER
+)
+
 def wave(color, wave_length, wait):
     """
     Creates a wave effect that moves down the strip and then back.
@@ -8,31 +23,28 @@ def wave(color, wave_length, wait):
     - wait: Delay between each frame.
     """
     center_brightness = 1.0  # Brightness of the center LED
+    half_width = wave_length // 2 + 1
+    positions = np.arange(num_pixels)
+    frame = FrameBuffer(1, num_pixels)
 
-    # Forward direction
-    for position in range(num_pixels + wave_length):
-        for i in range(num_pixels):
-            # Calculate brightness based on distance from the wave's center
-            distance = abs(i - position)
-            if distance < wave_length // 2 + 1:
-                brightness = max(0, center_brightness - (distance / (wave_length // 2 + 1)))
-                scaled_color = tuple(int(c * brightness) for c in color)
-                pixels[i] = scaled_color
-            else:
-                pixels[i] = (0, 0, 0)  # Turn off LEDs outside the wave range
-        pixels.show()
-        time.sleep(wait)
+    def render(position):
+        # Brightness falls off linearly from the wave's center; LEDs outside the wave are off
+        distance = np.abs(positions - position)
+        brightness = np.maximum(0, center_brightness - distance / half_width)
+        return apply_brightness(color, brightness, out=frame.pixels)
 
-    # Backward direction
-    for position in range(num_pixels + wave_length, -wave_length, -1):
-        for i in range(num_pixels):
-            # Calculate brightness based on distance from the wave's center
-            distance = abs(i - position)
-            if distance < wave_length // 2 + 1:
-                brightness = max(0, center_brightness - (distance / (wave_length // 2 + 1)))
-                scaled_color = tuple(int(c * brightness) for c in color)
-                pixels[i] = scaled_color
-            else:
-                pixels[i] = (0, 0, 0)  # Turn off LEDs outside the wave range
+    # Forward direction, then backward
+    forward = (render(position) for position in range(num_pixels + wave_length))
+    backward = (render(num_pixels + wave_length - step) for step in range(num_pixels + 2 * wave_length))
+    run_pipeline(chain(forward, backward), pace(1 / wait), output(pixels))
+
+def main():
+    try:
+        while True:
+            wave((0, 0, 255), 5, 0.05)
+    finally:
+        pixels.fill((0, 0, 0))
         pixels.show()
-        time.sleep(wait)
+
+if __name__ == "__main__":
+    main()